@@ -0,0 +1,152 @@
+from __future__ import annotations
+import numpy as np
+from solver import Solver
+
+DIGITS = np.arange(1, 10, dtype=np.int8)
+
+class BatchSolver():
+    """
+    Solves a stack of boards at once
+    The candidates and the naked and hidden singles of every board are found with whole array operations
+    Only the boards that are not solved by these passes are searched one at a time with Solver
+
+    Attributes
+    ----------
+    solver: Solver
+        the solver used for the boards that need searching
+    searched: int
+        the number of boards of the last call that needed searching
+
+    Methods
+    -------
+    solve(self, boards: np.ndarray) -> tuple
+        solves every board
+    propagate(self, grids: np.ndarray((N,9,9), np.int8)) -> np.ndarray(N, bool)
+        places naked and hidden singles in every board until none is left
+    candidates(grids: np.ndarray((N,9,9), np.int8)) -> np.ndarray((N,9,9,9), bool)
+        finds the candidates of every cell of every board
+    """
+
+    def __init__(self, solver: Solver = None):
+        """
+        Parameters
+        ----------
+        solver: Solver, optional, default: None
+            the solver used for the boards that need searching, a new Solver if None
+        """
+        self.solver = solver if solver is not None else Solver()
+        self.searched = 0
+
+    def solve(self, boards: np.ndarray) -> tuple:
+        """
+        Solves every board
+
+        Parameters
+        ----------
+        boards: np.ndarray((N,9,9), np.int8)|np.ndarray((N,81), np.int8)
+            the boards to solve, they are not changed
+
+        Returns
+        -------
+        tuple (np.ndarray, np.ndarray(N, bool))
+            the solutions in the shape of boards and whether each board was solved
+            a board that could not be solved is all zeros
+        """
+        boards = np.asarray(boards)
+        grids = boards.reshape((-1, 9, 9)).astype(np.int8)
+        alive = self.propagate(grids)
+        # the boards that still have empty cells need searching
+        unfinished = np.flatnonzero(alive & (grids == 0).any(axis=(1, 2)))
+        self.searched = len(unfinished)
+        for i in unfinished.tolist():
+            solution = self.solver.solve(grids[i])
+            if solution is None:
+                alive[i] = False
+            else:
+                grids[i] = solution
+        grids[~alive] = 0
+        return grids.reshape(boards.shape), alive
+
+    def propagate(self, grids: np.ndarray((N,9,9), np.int8)) -> np.ndarray:
+        """
+        Places naked and hidden singles in every board, in place, until none is left
+        Each pass handles all the boards that changed in the previous pass at once
+
+        Parameters
+        ----------
+        grids: np.ndarray((N,9,9), np.int8)
+            the boards being solved
+
+        Returns
+        -------
+        np.ndarray(N, bool)
+            False for the boards where a contradiction was found
+        """
+        alive = np.ones(len(grids), dtype=bool)
+        active = np.arange(len(grids))
+        while len(active):
+            grid = grids[active]
+            cand = self.candidates(grid)
+            counts = cand.sum(axis=3)
+            empty = grid == 0
+            # a value that is neither used nor possible in a unit has no place to go
+            onehot = grid[..., None] == DIGITS
+            present = onehot | cand
+            dead = (empty & (counts == 0)).any(axis=(1, 2))\
+                | ~present.any(axis=2).all(axis=(1, 2))\
+                | ~present.any(axis=1).all(axis=(1, 2))\
+                | ~self.__boxes(present).any(axis=(2, 4)).all(axis=(1, 2, 3))
+            # naked singles have one candidate, hidden singles are the only place for a value in a unit
+            naked = cand & (counts == 1)[..., None]
+            hidden = cand & ((cand.sum(axis=2, keepdims=True) == 1)
+                | (cand.sum(axis=1, keepdims=True) == 1)
+                | self.__unboxes(self.__boxes(cand).sum(axis=(2, 4), keepdims=True) == 1))
+            found = naked | hidden
+            # two values which can only go in the same cell
+            dead |= (found.sum(axis=3) > 1).any(axis=(1, 2))
+            new = (found * DIGITS).sum(axis=3, dtype=np.int8)
+            grid = grid + new
+            # singles found in the same pass can clash with each other
+            dead |= ~self.__consistent(grid)
+            changed = (new > 0).any(axis=(1, 2)) & ~dead
+            grids[active] = grid
+            alive[active[dead]] = False
+            active = active[changed]
+        return alive
+
+    @staticmethod
+    def candidates(grids: np.ndarray((N,9,9), np.int8)) -> np.ndarray:
+        """
+        Finds the candidates of every cell of every board
+
+        Parameters
+        ----------
+        grids: np.ndarray((N,9,9), np.int8)
+            the boards
+
+        Returns
+        -------
+        np.ndarray((N,9,9,9), bool)
+            [board, row, column, value - 1] is True if the value can be placed in the cell
+        """
+        onehot = grids[..., None] == DIGITS
+        used = onehot.any(axis=2, keepdims=True) | onehot.any(axis=1, keepdims=True)\
+            | BatchSolver.__unboxes(BatchSolver.__boxes(onehot).any(axis=(2, 4), keepdims=True))
+        return ~used & (grids == 0)[..., None]
+
+    @staticmethod
+    def __consistent(grids: np.ndarray((N,9,9), np.int8)) -> np.ndarray:
+        # no value appears twice in a row, column or box
+        onehot = (grids[..., None] == DIGITS).astype(np.int8)
+        return (onehot.sum(axis=2) <= 1).all(axis=(1, 2)) & (onehot.sum(axis=1) <= 1).all(axis=(1, 2))\
+            & (BatchSolver.__boxes(onehot).sum(axis=(2, 4)) <= 1).all(axis=(1, 2, 3))
+
+    @staticmethod
+    def __boxes(cells: np.ndarray) -> np.ndarray:
+        # (N, 9, 9, 9) -> (N, box row, row in box, box column, column in box, 9)
+        return cells.reshape((-1, 3, 3, 3, 3, 9))
+
+    @staticmethod
+    def __unboxes(boxes: np.ndarray) -> np.ndarray:
+        # (N, 3, 1, 3, 1, 9) -> (N, 9, 9, 9) so a box total lines up with every cell in the box
+        return np.broadcast_to(boxes, (len(boxes), 3, 3, 3, 3, 9)).reshape((-1, 9, 9, 9))
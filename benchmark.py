@@ -1,8 +1,20 @@
-from time import time
+import argparse
+import json
+import sys
+import tracemalloc
 import numpy as np
+from time import perf_counter
 from solver import Solver
+from batch import BatchSolver
+from dlx import DLXSolver
+from puzzle_io import from_string
+from strategies import STRATEGIES
 
-# Project Euler
+# The benchmark times solving, uniqueness checks and generation on three tiers of problems
+# the results can be saved as JSON and compared with a saved baseline
+# run with --help for the options
+
+# easy: Project Euler
 # https://projecteuler.net/problem=96
 
 project_euler = ["003020600900305001001806400008102900700000008006708200002609500800203009005010300",
@@ -56,19 +68,173 @@ project_euler = ["00302060090030500100180640000810290070000000800670820000260950
 "000003017015009008060000000100007000009000200000500004000000020500600340340200000",
 "300200000000107000706030500070009080900020004010800050009040301000702000000008006"]
 
-problems = []
-for problem in project_euler:
-    a_porblem = np.reshape(list(map(int, problem)), (9,9))
-    problems.append(a_porblem)
-solver = Solver()
-start = time()
-total = 0
-for problem in problems:
+# hard: Arto Inkala's Sudoku, Easter Monster, Golden Nugget and Platinum Blonde
+hard = ["800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+"100000002090400050006000700050903000000070000000850040700000600030009080002000001",
+"000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+"000000012000000003002300400001800005060070800000009000008500000900040500470006000"]
+
+# 17-clue: the fewest clues a Sudoku with a unique solution can have
+# these are from Gordon Royle's collection and Peter Norvig's hardest problem
+seventeen_clue = ["000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+"000000010400000000020000000000050604008000300001090000300400200050100000000807000",
+"000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+"000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+"000000012008030000000000040120500000000004700060000000507000300000620000000100000",
+"000000013000030080070000000000206000030000900000010000600500204000400700100000000",
+"000000013000200000000000080000760200008000400010000000200000750600340000000008000",
+"000000013000500070000802000000400900107000000000000200890000050040000600000010000",
+"400000805030000000000700000020000060000080400000010000000603070500200000104000000"]
+
+TIERS = {"easy": project_euler, "hard": hard, "17-clue": seventeen_clue}
+# the metrics where a higher value is worse, these are the ones checked for regressions
+COSTS = ("total", "p50", "p95", "p99", "peak_memory")
+
+def solve(solver, problem) -> None:
     solution = solver.solve(problem)
-    assert solution is not None
-    total += (solution[0, 0] * 100) + (solution[0,1] * 10) + solution[0,2]
-print(f"Time take: {time() - start}")
-assert total == 24702 # ensure that the solver works accurately
+    assert solution is not None and Solver.validate(solution)
+
+def unique(solver, problem) -> None:
+    assert solver.count_solutions(problem, 2) == 1
+
+def generate(solver, _) -> None:
+    solver.generate_unique()
+
+def measure(solver, problems: list, task) -> dict:
+    """
+    Runs a task on every problem and summarizes the time taken
+    The peak memory is measured in a second run because tracing slows everything down
+
+    Parameters
+    ----------
+    solver: Solver|DLXSolver
+        the solver used, its nodes are read after every problem
+    problems: list
+        the problems
+    task: function
+        takes the solver and a problem
+
+    Returns
+    -------
+    dict
+        the total time and the p50, p95 and p99 latencies in seconds, the nodes searched,
+        the nodes per second and the peak memory in bytes
+    """
+    times = []
+    nodes = 0
+    for problem in problems:
+        solver.nodes = 0
+        start = perf_counter()
+        task(solver, problem)
+        times.append(perf_counter() - start)
+        nodes += solver.nodes
+    tracemalloc.start()
+    for problem in problems:
+        task(solver, problem)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    p50, p95, p99 = np.percentile(times, [50, 95, 99]).tolist()
+    total = sum(times)
+    return {"total": total, "p50": p50, "p95": p95, "p99": p99, "nodes": nodes,
+        "nodes_per_second": nodes / total if total else 0.0, "peak_memory": peak}
+
+def run(names: list, generated: int) -> dict:
+    """
+    Benchmarks the solvers on every tier and the generator
+
+    Parameters
+    ----------
+    names: list
+        the solvers to run, the names in STRATEGIES or "dlx"
+    generated: int
+        the number of boards to generate
+
+    Returns
+    -------
+    dict
+        the results by solver, tier and task, the batch solver and the generator
+    """
+    problems = {tier: [from_string(problem) for problem in lines] for tier, lines in TIERS.items()}
+    # ensure that the solver works accurately
+    easy = [Solver().solve(problem) for problem in problems["easy"]]
+    assert sum(int(a) * 100 + int(b) * 10 + int(c) for a, b, c in (s[0, :3] for s in easy)) == 24702
+    results = {"solvers": {}, "batch": {}}
+    for name in names:
+        solver = DLXSolver() if name == "dlx" else Solver(STRATEGIES[name])
+        results["solvers"][name] = {tier: {"solve": measure(solver, tier_problems, solve),
+            "unique": measure(solver, tier_problems, unique)} for tier, tier_problems in problems.items()}
+    # the whole tier at once, the vectorized passes solve most of it before any search
+    for tier, tier_problems in problems.items():
+        batch_solver = BatchSolver()
+        start = perf_counter()
+        solutions, solved = batch_solver.solve(np.array(tier_problems))
+        assert solved.all() and Solver.validate(solutions).all()
+        results["batch"][tier] = {"total": perf_counter() - start, "searched": batch_solver.searched}
+    results["generate"] = measure(Solver(), [None] * generated, generate)
+    return results
+
+def regressions(results: dict, baseline: dict, threshold: float, path: str = "") -> list:
+    """
+    Finds the costs that grew by more than threshold compared to the baseline
+
+    Parameters
+    ----------
+    results: dict
+        the results of this run
+    baseline: dict
+        the results of a saved run
+    threshold: float
+        the allowed growth, 0.2 means 20%
+    path: str, optional, default: ""
+        the keys leading to results, used in the report
+
+    Returns
+    -------
+    list
+        a line describing every regression
+    """
+    found = []
+    for key, value in results.items():
+        if key not in baseline:
+            continue
+        if isinstance(value, dict):
+            found.extend(regressions(value, baseline[key], threshold, f"{path}{key}."))
+        elif key in COSTS and baseline[key] and value > baseline[key] * (1 + threshold):
+            found.append(f"{path}{key}: {baseline[key]:.6g} -> {value:.6g} (+{value / baseline[key] - 1:.0%})")
+    return found
+
+def report(results: dict) -> None:
+    """Prints the results as a table, the times are in milliseconds"""
+    print(f"{'solver':12}{'tier':9}{'task':8}{'total':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'nodes':>10}{'nodes/s':>11}{'peak KiB':>10}")
+    rows = [(name, tier, task, stats) for name, tiers in results["solvers"].items()
+        for tier, tasks in tiers.items() for task, stats in tasks.items()]
+    rows.append(("generator", "", "generate", results["generate"]))
+    for name, tier, task, stats in rows:
+        print(f"{name:12}{tier:9}{task:8}{stats['total'] * 1000:10.1f}{stats['p50'] * 1000:9.2f}"
+            f"{stats['p95'] * 1000:9.2f}{stats['p99'] * 1000:9.2f}{stats['nodes']:10}{stats['nodes_per_second']:11.0f}"
+            f"{stats['peak_memory'] / 1024:10.1f}")
+    for tier, stats in results["batch"].items():
+        print(f"{'batch':12}{tier:9}{'solve':8}{stats['total'] * 1000:10.1f}  searched {stats['searched']}")
+
 
-for problem in problems:
-    assert solver.has_unique_solution(problem)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the solvers and the generator")
+    parser.add_argument("--solvers", nargs="+", default=[*STRATEGIES, "dlx"], choices=[*STRATEGIES, "dlx"],
+        help="the solvers to run")
+    parser.add_argument("--generate", type=int, default=20, help="the number of boards to generate")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="compare the results with the ones saved in this file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="the growth that counts as a regression")
+    args = parser.parse_args()
+    results = run(args.solvers, args.generate)
+    report(results)
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+    if args.baseline:
+        with open(args.baseline) as saved:
+            found = regressions(results, json.load(saved), args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+import math
+import numpy as np
+
+class Layout():
+    """
+    The lookup tables of a board made of boxes of box_size by box_size cells, eg 3 for the usual 9 by 9 board
+    The cells are numbered 0 - (area - 1) row by row, cell = size * row + column
+    The tables are computed once per box size and shared by the whole package
+    so the generator and the solver look things up rather than doing arithmetic
+
+    Attributes
+    ----------
+    box_size: int
+        the number of rows (and columns) of a box
+    size: int
+        the number of rows, columns and values of the board, box_size ** 2
+    area: int
+        the number of cells, size ** 2
+    row: list[int]
+        the row of every cell
+    col: list[int]
+        the column of every cell
+    box: list[int]
+        the box of every cell, the boxes are numbered row by row
+    pos: list[tuple]
+        the (row, column) position of every cell
+    units: list[list[int]]
+        the cells of every unit, the rows come first then the columns and the boxes
+    cell_units: list[tuple]
+        the three units every cell belongs to, as indices into units
+    peers: list[list[int]]
+        the cells that share a row, column or box with every cell
+    intersections: list[tuple]
+        every box and line that cross: the shared cells, the rest of the box and the rest of the line
+    all_values: int
+        the mask with every value, bit (val - 1) represents the value val
+    mask_values: list|MaskTable
+        the values in every mask
+    mask_sizes: list|MaskTable
+        the number of values in every mask
+
+    Classmethods
+    ------------
+    of(size: int) -> Layout
+        gets the shared layout of a board with size rows
+    """
+    __slots__ = ("box_size", "size", "area", "row", "col", "box", "pos", "units", "cell_units", "peers",
+        "intersections", "all_values", "mask_values", "mask_sizes")
+    # the layouts made so far by their size
+    layouts = {}
+
+    def __init__(self, box_size: int = 3):
+        """
+        Parameters
+        ----------
+        box_size: int, optional, default: 3
+            the number of rows of a box
+        """
+        size = box_size * box_size
+        self.box_size = box_size
+        self.size = size
+        self.area = size * size
+        cells = range(self.area)
+        self.row = [cell // size for cell in cells]
+        self.col = [cell % size for cell in cells]
+        self.box = [(cell // (size * box_size)) * box_size + (cell % size) // box_size for cell in cells]
+        self.pos = [(cell // size, cell % size) for cell in cells]
+        starts = range(0, size, box_size)
+        self.units = [[size * row + col for col in range(size)] for row in range(size)]\
+            + [[size * row + col for row in range(size)] for col in range(size)]\
+            + [[size * (row + i // box_size) + col + i % box_size for i in range(size)] for row in starts for col in starts]
+        self.cell_units = [(self.row[cell], size + self.col[cell], 2 * size + self.box[cell]) for cell in cells]
+        self.peers = [sorted({peer for unit in self.cell_units[cell] for peer in self.units[unit]} - {cell})
+            for cell in cells]
+        self.intersections = [(common, [cell for cell in box if cell not in common], [cell for cell in line if cell not in common])
+            for box in self.units[2 * size:] for line in self.units[:2 * size]
+            for common in [[cell for cell in box if cell in line]] if common]
+        self.all_values = (1 << size) - 1
+        # a list of every mask is cheap for 9 values, for more the masks are worked out when they are first seen
+        if size <= 9:
+            self.mask_values = [mask_values(mask) for mask in range(1 << size)]
+            self.mask_sizes = [len(values) for values in self.mask_values]
+        else:
+            self.mask_values = MaskTable(mask_values)
+            self.mask_sizes = MaskTable(int.bit_count)
+
+    @classmethod
+    def of(cls, size: int) -> Layout:
+        """
+        Gets the shared layout of a board
+
+        Parameters
+        ----------
+        size: int
+            the number of rows of the board, it has to be a square number eg 9, 16 or 25
+
+        Returns
+        -------
+        Layout
+            the layout of the board
+        """
+        layout = cls.layouts.get(size)
+        if layout is None:
+            box_size = math.isqrt(size)
+            if box_size < 1 or box_size * box_size != size:
+                raise ValueError(f"a board with {size} rows cannot be split into square boxes")
+            layout = cls.layouts[size] = cls(box_size)
+        return layout
+
+class MaskTable(dict):
+    """A mask lookup for the sizes where a list of every mask is too big, a mask is worked out the first time it is seen"""
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+
+    def __missing__(self, mask: int):
+        value = self[mask] = self.function(mask)
+        return value
+
+def mask_values(mask: int) -> list:
+    """
+    Gets the values of a mask
+
+    Parameters
+    ----------
+    mask: int
+        the mask, bit (val - 1) is set if val is in it
+
+    Returns
+    -------
+    list
+        the values in increasing order
+    """
+    return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+# the usual 9 by 9 board, the layout used when none is given
+LAYOUT = Layout.of(9)
+
+class Board():
+    """
+    A board stored as bytes, one per cell, row by row
+    Reading or writing a cell is an index into a bytearray which is far cheaper than indexing a numpy array
+    The numpy view of the board shares the same memory so nothing is copied when it is returned
+
+    Attributes
+    ----------
+    cells: bytearray
+        the value of every cell, 0 for the empty cells
+    array: np.ndarray((size,size), np.int8)
+        a view of the cells as a size by size array, changing one changes the other
+    layout: Layout
+        the tables of the board
+
+    Classmethods
+    ------------
+    from_array(grid: list[list[int]]|np.ndarray((size,size), np.int8)) -> Board
+        copies a grid into a new board
+    """
+    __slots__ = ("cells", "array", "layout")
+
+    def __init__(self, cells: bytearray = None, layout: Layout = LAYOUT):
+        """
+        Parameters
+        ----------
+        cells: bytearray, optional, default: None
+            the values of the cells, an empty board if None
+        layout: Layout, optional, default: LAYOUT
+            the tables of the board, the 9 by 9 board by default
+        """
+        self.cells = cells if cells is not None else bytearray(layout.area)
+        self.layout = layout
+        self.array = np.frombuffer(self.cells, dtype=np.int8).reshape((layout.size, layout.size))
+
+    @classmethod
+    def from_array(cls, grid: list[list[int]]|np.ndarray((size,size), np.int8)) -> Board:
+        """
+        Copies a grid into a new board
+
+        Parameters
+        ----------
+        grid: list[list[int]]|np.ndarray((size,size), np.int8)
+            the grid to copy, its number of rows gives the layout
+
+        Returns
+        -------
+        Board
+            the new board
+        """
+        grid = np.ascontiguousarray(grid, dtype=np.int8)
+        return cls(bytearray(grid.tobytes()), Layout.of(len(grid)))
+
+    def __getitem__(self, pos: tuple) -> int:
+        return self.cells[self.layout.size * pos[0] + pos[1]]
+
+    def __setitem__(self, pos: tuple, val: int) -> None:
+        self.cells[self.layout.size * pos[0] + pos[1]] = val
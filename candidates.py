@@ -0,0 +1,164 @@
+from __future__ import annotations
+import numpy as np
+from board import Board, Layout
+
+class Candidates():
+    """
+    Keeps track of the values already used in every row, column and box of a grid
+    Each unit is stored as a size-bit integer where bit (val - 1) is set if val is used in that unit
+    This means that the candidates of a cell can be found in O(1) rather than scanning the grid
+    Cells are numbered row by row as in board.py
+
+    Attributes
+    ----------
+    rows: list[int]
+        the masks of the values used in each row
+    cols: list[int]
+        the masks of the values used in each column
+    boxes: list[int]
+        the masks of the values used in each box
+    empty: set
+        the cells that are still empty
+    trail: list
+        the (cell, value) pairs assigned during the search so that they can be undone in order
+    layout: Layout
+        the tables of the grid
+    clash: bool
+        whether or not two of the values the grid was built from are the same in a row, column or box
+
+    Methods
+    -------
+    place(self, cell: int, val: int) -> None
+        marks val as used in the row, column and box of cell
+    unplace(self, cell: int, val: int) -> None
+        marks val as no longer used in the row, column and box of cell
+    mask(self, cell: int) -> int
+        returns the mask of the values that can be placed in cell
+    allowed(self, cell: int) -> list
+        returns a list of the values that can be placed in cell
+    used(self, unit: int) -> int
+        returns the mask of the values used in a unit
+    """
+    __slots__ = ("rows", "cols", "boxes", "empty", "trail", "layout", "clash")
+
+    def __init__(self, grid: Board|np.ndarray((size,size), np.int8)):
+        """
+        Builds the masks from the values already in the grid
+
+        Parameters
+        ----------
+        grid: Board|np.ndarray((size,size), np.int8)
+            the grid being worked on
+        """
+        if isinstance(grid, Board):
+            self.layout = grid.layout
+            values = grid.cells
+        else:
+            grid = np.asarray(grid)
+            self.layout = Layout.of(len(grid))
+            values = grid.ravel().tolist()
+        size = self.layout.size
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        self.empty = set()
+        self.trail = []
+        self.clash = False
+        for cell, val in enumerate(values):
+            if val:
+                # a value already used by a peer would only be ORed in again and go unnoticed
+                if not self.mask(cell) >> (val - 1) & 1:
+                    self.clash = True
+                self.place(cell, val)
+            else:
+                self.empty.add(cell)
+
+    def place(self, cell: int, val: int) -> None:
+        """
+        Marks a value as used in the units of a cell
+
+        Parameters
+        ----------
+        cell: int
+            the cell of insertion
+        val: int
+            the value inserted
+        """
+        layout = self.layout
+        bit = 1 << (val - 1)
+        self.rows[layout.row[cell]] |= bit
+        self.cols[layout.col[cell]] |= bit
+        self.boxes[layout.box[cell]] |= bit
+        self.empty.discard(cell)
+
+    def unplace(self, cell: int, val: int) -> None:
+        """
+        Marks a value as no longer used in the units of a cell
+
+        Parameters
+        ----------
+        cell: int
+            the cell the value is removed from
+        val: int
+            the value removed
+        """
+        layout = self.layout
+        bit = ~(1 << (val - 1))
+        self.rows[layout.row[cell]] &= bit
+        self.cols[layout.col[cell]] &= bit
+        self.boxes[layout.box[cell]] &= bit
+        self.empty.add(cell)
+
+    def mask(self, cell: int) -> int:
+        """
+        Gets the mask of the values that can be placed in a cell
+
+        Parameters
+        ----------
+        cell: int
+            the cell to check
+
+        Returns
+        -------
+        int
+            a mask where bit (val - 1) is set if val can be placed
+        """
+        layout = self.layout
+        return layout.all_values & ~(self.rows[layout.row[cell]] | self.cols[layout.col[cell]] | self.boxes[layout.box[cell]])
+
+    def allowed(self, cell: int) -> list:
+        """
+        Gets the values that can be placed in a cell
+
+        Parameters
+        ----------
+        cell: int
+            the cell to check
+
+        Returns
+        -------
+        list
+            a list of valid candidates
+        """
+        return list(self.layout.mask_values[self.mask(cell)])
+
+    def used(self, unit: int) -> int:
+        """
+        Gets the values already used in a unit
+
+        Parameters
+        ----------
+        unit: int
+            the index of the unit in Layout.units, the rows come first then the columns and the boxes
+
+        Returns
+        -------
+        int
+            a mask where bit (val - 1) is set if val is used in the unit
+        """
+        size = self.layout.size
+        if unit < size:
+            return self.rows[unit]
+        if unit < 2 * size:
+            return self.cols[unit - size]
+        return self.boxes[unit - 2 * size]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+import collections
+import itertools
+import numpy as np
+from puzzle_io import from_string
+from solver import Solver
+
+# A 9 by 9 puzzle stays a puzzle of the same difficulty with the same number of solutions when
+# it is transposed, its bands (groups of three rows) or the rows inside a band are swapped,
+# its stacks (groups of three columns) or the columns inside a stack are swapped or its values are relabeled
+# The canonical form is the smallest of all these versions when read row by row as a string of digits,
+# equivalent puzzles have the same canonical form so a solution found once can be reused for all of them
+
+# every way to order the columns: the order of the stacks and the order of the columns inside each stack
+COLUMN_ORDERS = np.array([[3 * stacks[block] + inner[block][i] for block in range(3) for i in range(3)]
+    for stacks in itertools.permutations(range(3))
+    for inner in itertools.product(itertools.permutations(range(3)), repeat=3)], dtype=np.intp)
+# turns a row of digits into a number so that comparing rows is comparing numbers
+DIGIT_WEIGHTS = 10 ** np.arange(8, -1, -1, dtype=np.int64)
+
+class Transform():
+    """
+    One of the symmetries of a 9 by 9 sudoku, it turns a grid into its canonical form
+
+    Attributes
+    ----------
+    transpose: bool
+        whether or not the grid is transposed first
+    rows: np.ndarray(9, np.intp)
+        the row of the (transposed) grid that becomes each row
+    cols: np.ndarray(9, np.intp)
+        the column of the (transposed) grid that becomes each column
+    labels: np.ndarray(10, np.int8)
+        the new value of every value, 0 stays 0
+
+    Methods
+    -------
+    apply(self, grid: np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8)
+        transforms a grid
+    invert(self, grid: np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8)
+        undoes the transform
+    """
+    __slots__ = ("transpose", "rows", "cols", "labels")
+
+    def __init__(self, transpose: bool, rows: np.ndarray, cols: np.ndarray, labels: np.ndarray):
+        """
+        Parameters
+        ----------
+        transpose: bool
+            whether or not the grid is transposed first
+        rows: np.ndarray(9, np.intp)
+            the row of the (transposed) grid that becomes each row
+        cols: np.ndarray(9, np.intp)
+            the column of the (transposed) grid that becomes each column
+        labels: np.ndarray(10, np.int8)
+            the new value of every value, it has to use every value from 1 to 9 once
+        """
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def apply(self, grid: np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8):
+        """
+        Transforms a grid
+
+        Parameters
+        ----------
+        grid: np.ndarray((9,9), np.int8)
+            the grid to transform, it is not changed
+
+        Returns
+        -------
+        np.ndarray((9,9), np.int8)
+            the transformed grid
+        """
+        grid = np.asarray(grid)
+        if self.transpose:
+            grid = grid.T
+        return self.labels[grid[np.ix_(self.rows, self.cols)]]
+
+    def invert(self, grid: np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8):
+        """
+        Undoes the transform, invert(apply(grid)) is grid
+
+        Parameters
+        ----------
+        grid: np.ndarray((9,9), np.int8)
+            the transformed grid, eg the solution of a canonical puzzle
+
+        Returns
+        -------
+        np.ndarray((9,9), np.int8)
+            the grid before the transform
+        """
+        values = np.empty(10, dtype=np.int8)
+        values[self.labels] = np.arange(10, dtype=np.int8)
+        original = np.empty((9, 9), dtype=np.int8)
+        original[np.ix_(self.rows, self.cols)] = values[np.asarray(grid)]
+        return original.T.copy() if self.transpose else original
+
+def canonicalize(board: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> tuple:
+    """
+    Finds the canonical form of a 9 by 9 puzzle, the smallest of its equivalent versions read row by row
+    The rows are picked one at a time, keeping every version that gives the smallest rows so far
+    All the versions are handled at once with numpy, and versions that can only lead to the same grid are merged,
+    so the few thousand versions that survive the first row quickly shrink to a handful
+
+    Parameters
+    ----------
+    board: str|list[list[int]]|np.ndarray((9,9), np.int8)
+        the puzzle, 0 for the empty cells
+
+    Returns
+    -------
+    tuple (np.ndarray((9,9), np.int8), Transform)
+        the canonical form and the transform that turns the puzzle into it
+    """
+    grid = from_string(board) if isinstance(board, str) else np.asarray(board, dtype=np.int8)
+    if grid.shape != (9, 9):
+        raise ValueError("only 9 by 9 puzzles have a canonical form")
+    grids = np.stack([grid, grid.T]).astype(np.intp)
+    # the values of a row are all different so the first row relabeled is 1, 2, 3... wherever it has a value,
+    # only the column orders that put the empty cells of some row as far left as they can go are worth trying
+    # so the first row and the column order are picked together
+    filled = (grids != 0)[:, :, COLUMN_ORDERS] @ DIGIT_WEIGHTS
+    flips, first_rows, columns = np.nonzero(filled == filled.min())
+    # every version still in the running: the grid it starts from, its column order, the rows picked so far,
+    # the labels given so far and the next label to give
+    count = len(flips)
+    picked = first_rows[:, None]
+    labels = np.zeros((count, 10), dtype=np.intp)
+    next_label = np.ones(count, dtype=np.intp)
+    _relabel(grids[flips, first_rows][np.arange(count)[:, None], COLUMN_ORDERS[columns]], labels, next_label)
+    for row in range(1, 9):
+        count = len(flips)
+        used = np.zeros((count, 9), dtype=bool)
+        used[np.arange(count)[:, None], picked] = True
+        if row % 3 == 0:
+            # a new band can come from any band not used yet
+            used_bands = used.reshape((count, 3, 3)).any(axis=2)
+            allowed = ~np.repeat(used_bands, 3, axis=1)
+        else:
+            # the rest of the band comes from the same band as its first row
+            band = picked[:, row - row % 3] // 3
+            allowed = (np.arange(9) // 3 == band[:, None]) & ~used
+        state, source = np.nonzero(allowed)
+        flips, columns, labels, next_label = flips[state], columns[state], labels[state].copy(), next_label[state].copy()
+        picked = np.concatenate([picked[state], source[:, None]], axis=1)
+        values = grids[flips, source][np.arange(len(state))[:, None], COLUMN_ORDERS[columns]]
+        # only the versions with the smallest row carry on
+        codes = _relabel(values, labels, next_label) @ DIGIT_WEIGHTS
+        best = np.flatnonzero(codes == codes.min())
+        flips, columns, picked, labels, next_label = flips[best], columns[best], picked[best], labels[best], next_label[best]
+        # versions that would give the same grid whatever rows are picked next can be merged
+        if len(flips) > 1:
+            keys = _remaining(grids, flips, columns, picked, labels)
+            _, first = np.unique(keys.view(np.dtype((np.void, keys.shape[1]))).ravel(), return_index=True)
+            first.sort()
+            flips, columns, picked, labels, next_label = flips[first], columns[first], picked[first], labels[first], next_label[first]
+    # the values missing from the puzzle get the labels left over so that the labels can be undone
+    labels = labels[0]
+    missing = [val for val in range(1, 10) if not labels[val]]
+    labels[missing] = sorted(set(range(1, 10)) - set(labels.tolist()))
+    transform = Transform(bool(flips[0]), picked[0], COLUMN_ORDERS[columns[0]].copy(), labels.astype(np.int8))
+    return transform.apply(grid), transform
+
+def _relabel(values: np.ndarray, labels: np.ndarray, next_label: np.ndarray) -> np.ndarray:
+    # relabels a row of every version, in place, giving the values without a label the next label in the order they appear
+    relabeled = np.empty_like(values)
+    everyone = np.arange(len(values))
+    for col in range(9):
+        val = values[:, col]
+        new = (val != 0) & (labels[everyone, val] == 0)
+        labels[everyone[new], val[new]] = next_label[new]
+        next_label += new
+        relabeled[:, col] = labels[everyone, val]
+    return relabeled
+
+def _remaining(grids: np.ndarray, flips: np.ndarray, columns: np.ndarray, picked: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    # the rows not picked yet with their columns reordered and the labels given so far,
+    # the values without a label are kept apart from the labels by adding 10
+    count = len(flips)
+    values = np.take_along_axis(grids[flips], COLUMN_ORDERS[columns][:, None, :], axis=2)
+    relabeled = labels[np.arange(count)[:, None, None], values]
+    relabeled = np.where((relabeled == 0) & (values != 0), values + 10, relabeled)
+    relabeled[np.arange(count)[:, None], picked] = -1
+    return np.ascontiguousarray(np.concatenate([relabeled.reshape((count, 81)), labels], axis=1), dtype=np.int8)
+
+class SolutionCache():
+    """
+    Remembers the solutions of the puzzles it solved by their canonical form
+    A puzzle that is a transposed, reordered or relabeled version of one solved before is answered
+    by undoing its transform on the stored solution instead of searching again
+    The least recently used solutions are dropped once there are maxsize of them
+
+    Attributes
+    ----------
+    solver: Solver
+        the solver used when a puzzle is not in the cache
+    maxsize: int
+        the number of solutions kept
+    hits: int
+        the number of puzzles answered from the cache
+    misses: int
+        the number of puzzles that had to be solved
+
+    Methods
+    -------
+    solve(self, board: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8)
+        solves a puzzle, using the cache when it can
+    clear(self) -> None
+        forgets every solution
+    """
+
+    def __init__(self, solver: Solver = None, maxsize: int = 1024):
+        """
+        Parameters
+        ----------
+        solver: Solver, optional, default: None
+            the solver used when a puzzle is not in the cache, a new Solver if None
+        maxsize: int, optional, default: 1024
+            the number of solutions kept
+        """
+        self.solver = solver if solver is not None else Solver()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # canonical puzzle -> canonical solution, the most recently used last
+        self.__solutions = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__solutions)
+
+    def solve(self, board: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8):
+        """
+        Solves a puzzle, using the cache when it can
+
+        Parameters
+        ----------
+        board: str|list[list[int]]|np.ndarray((9,9), np.int8)
+            the puzzle
+
+        Returns
+        -------
+        np.ndarray((9,9), np.int8)
+            the solution or None if there is none
+        """
+        canonical, transform = canonicalize(board)
+        key = canonical.tobytes()
+        if key in self.__solutions:
+            self.hits += 1
+            self.__solutions.move_to_end(key)
+            solution = self.__solutions[key]
+        else:
+            self.misses += 1
+            solution = self.solver.solve(canonical)
+            self.__solutions[key] = solution
+            if len(self.__solutions) > self.maxsize:
+                self.__solutions.popitem(last=False)
+        return None if solution is None else transform.invert(solution)
+
+    def clear(self) -> None:
+        """Forgets every solution and resets the counters"""
+        self.__solutions.clear()
+        self.hits = 0
+        self.misses = 0
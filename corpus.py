@@ -0,0 +1,161 @@
+from __future__ import annotations
+import argparse
+import multiprocessing
+import numpy as np
+import sys
+from time import perf_counter
+from typing import Iterator, TextIO
+from puzzle_io import to_string
+from solver import Solver
+from techniques import DIFFICULTY
+
+# Generates large numbers of unique puzzles offline, run with --help for the options
+# Every line of the output is the problem, its solution and its difficulty separated by spaces
+# the problem and the solution are 81 characters as in puzzle_pool.txt, the difficulty is Solver.rate's score
+
+# no 9 by 9 puzzle with fewer clues has a unique solution
+MIN_CLUES = 17
+
+def generate_puzzles(count: int, difficulty: tuple = (1, 8), clues: tuple = None, seed: int = 0,
+        workers: int = None, chunksize: int = 16, max_tries: int = 1000) -> Iterator[tuple]:
+    """
+    Generates unique puzzles in a range of difficulty and of clues, sharding the work across a pool of processes
+    The work is split in jobs of chunksize puzzles and every job has its own seed worked out from seed,
+    so the same arguments always give the same puzzles in the same order whatever the number of workers
+
+    Parameters
+    ----------
+    count: int
+        the number of puzzles
+    difficulty: tuple, optional, default: (1, 8)
+        the lowest and the highest difficulty allowed, see techniques.DIFFICULTY
+    clues: tuple, optional, default: None
+        the fewest and the most values a puzzle can have, if None as many cells as possible are removed
+    seed: int, optional, default: 0
+        the seed the seeds of the jobs are made from
+    workers: int, optional, default: None
+        the number of processes, it defaults to the number of cores
+        if it is 1, the puzzles are generated in this process
+    chunksize: int, optional, default: 16
+        the number of puzzles in a job
+    max_tries: int, optional, default: 1000
+        the most boards a job generates for one puzzle before it gives up with a RuntimeError
+
+    Returns
+    -------
+    Iterator[tuple]
+        yields the problem, its solution, its difficulty and the number of boards generated to find it
+        a ValueError is raised at once if no puzzle can be in the range of difficulty or of clues
+    """
+    lowest, highest = difficulty
+    scores = sorted(set(DIFFICULTY.values()))
+    # a range that cannot be met would have the workers generate boards forever
+    if not any(lowest <= score <= highest for score in scores):
+        raise ValueError(f"no difficulty is from {lowest} to {highest}, the difficulties are {scores}")
+    if clues is not None and not (clues[0] <= clues[1] and MIN_CLUES <= clues[1] <= 81):
+        raise ValueError(f"the most clues have to be from {MIN_CLUES} to 81 and no fewer than the fewest, got {clues[0]} to {clues[1]}")
+    jobs = [(seed, job, min(chunksize, count - start), difficulty, clues, max_tries)
+        for job, start in enumerate(range(0, count, chunksize))]
+    # the checks above are made when this is called, the generating waits for the first puzzle to be asked for
+    return _generate(jobs, workers)
+
+def _generate(jobs: list, workers: int) -> Iterator[tuple]:
+    if workers == 1:
+        for job in jobs:
+            yield from _generate_job(job)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        # imap keeps the jobs in order while they are generated in parallel
+        for puzzles in pool.imap(_generate_job, jobs):
+            yield from puzzles
+
+def write_puzzles(puzzles: Iterator[tuple], dest: str|TextIO = "-", report: TextIO = None, every: int = 1000) -> int:
+    """
+    Writes the puzzles one per line as they are produced
+
+    Parameters
+    ----------
+    puzzles: Iterator[tuple]
+        the puzzles from generate_puzzles
+    dest: str|TextIO, optional, default: "-"
+        the path of the file, an open file, or "-" for stdout
+    report: TextIO, optional, default: None
+        where to write the throughput, eg sys.stderr, if None nothing is reported
+    every: int, optional, default: 1000
+        the number of puzzles between two reports
+
+    Returns
+    -------
+    int
+        the number of puzzles written
+    """
+    if isinstance(dest, str) and dest != "-":
+        with open(dest, "w") as lines:
+            return write_puzzles(puzzles, lines, report, every)
+    out = sys.stdout if dest == "-" else dest
+    start = perf_counter()
+    count = boards = 0
+    for problem, solution, score, tried in puzzles:
+        out.write(f"{problem} {solution} {score}\n")
+        count += 1
+        boards += tried
+        if report is not None and count % every == 0:
+            _report(report, count, boards, perf_counter() - start)
+    out.flush()
+    if report is not None:
+        _report(report, count, boards, perf_counter() - start)
+    return count
+
+def _report(report: TextIO, count: int, boards: int, seconds: float) -> None:
+    rate = count / seconds if seconds else 0.0
+    print(f"{count} puzzles in {seconds:.1f}s, {rate:.1f} puzzles/s, {boards} boards generated", file=report, flush=True)
+
+def _generate_job(job: tuple) -> list:
+    # every job seeds numpy from the seed of the run and its own number so that it does not depend on the process
+    seed, number, count, (lowest, highest), clues, max_tries = job
+    rng = np.random.default_rng([seed, number])
+    np.random.seed(rng.integers(2 ** 32))
+    solver = Solver()
+    puzzles = []
+    tried = 0
+    while len(puzzles) < count:
+        if tried == max_tries:
+            raise RuntimeError(f"no puzzle in the range was found in {max_tries} boards")
+        tried += 1
+        if clues is None:
+            problem, solution = solver.generate_unique()
+        else:
+            # the digging stops at a random number of clues in the range, it stops above it if no more cells can go
+            fewest, most = clues
+            problem, solution = solver.generate_unique(int(rng.integers(fewest, most + 1)))
+            if np.count_nonzero(problem) > most:
+                continue
+        score, _ = solver.rate(problem)
+        if lowest <= score <= highest:
+            puzzles.append((to_string(problem), to_string(solution), score, tried))
+            tried = 0
+    return puzzles
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates unique sudoku puzzles with their solutions and difficulty")
+    parser.add_argument("count", type=int, help="the number of puzzles")
+    parser.add_argument("-o", "--output", default="-", help="where to write the puzzles, - for stdout")
+    parser.add_argument("-d", "--difficulty", type=int, nargs=2, default=(1, DIFFICULTY["search"]), metavar=("MIN", "MAX"),
+        help="the range of difficulty, 1 is singles only and 8 needs guessing, see techniques.DIFFICULTY")
+    parser.add_argument("-c", "--clues", type=int, nargs=2, default=None, metavar=("MIN", "MAX"),
+        help="the range of the number of clues, by default as many cells as possible are removed")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="the same seed gives the same puzzles")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the number of processes")
+    parser.add_argument("--chunksize", type=int, default=16, help="the number of puzzles in a job")
+    parser.add_argument("--max-tries", type=int, default=1000, help="the most boards generated for one puzzle")
+    args = parser.parse_args()
+    clues = tuple(args.clues) if args.clues else None
+    try:
+        puzzles = generate_puzzles(args.count, tuple(args.difficulty), clues, args.seed, args.workers, args.chunksize,
+            args.max_tries)
+    except ValueError as error:
+        parser.error(str(error))
+    try:
+        write_puzzles(puzzles, args.output, sys.stderr)
+    except RuntimeError as error:
+        sys.exit(f"error: {error}")
@@ -0,0 +1,284 @@
+from __future__ import annotations
+import numpy as np
+from solver import Solver
+
+# Sudoku as an exact cover problem
+# every (row, column, value) choice is a row of the matrix, there are 9 * 9 * 9 = 729 of them
+# every choice satisfies 4 of the 324 constraints:
+#   0 - 80: the cell (row, column) is filled
+#   81 - 161: the row has the value
+#   162 - 242: the column has the value
+#   243 - 323: the box has the value
+def _constraints(row: int, col: int, val: int) -> tuple:
+    box = (row // 3) * 3 + col // 3
+    return (9 * row + col, 81 + 9 * row + val - 1, 162 + 9 * col + val - 1, 243 + 9 * box + val - 1)
+
+def _build_template() -> tuple:
+    """
+    Builds the dancing links of the full exact cover matrix
+    The links are stored in flat lists: node 0 is the root, nodes 1 - 324 are the column headers
+    and every choice adds 4 nodes after that
+
+    Returns
+    -------
+    tuple
+        the left, right, up, down, column and size lists, and the choice of every node
+    """
+    columns = 324
+    left = [i - 1 for i in range(columns + 1)]
+    right = [i + 1 for i in range(columns + 1)]
+    left[0], right[columns] = columns, 0
+    up = list(range(columns + 1))
+    down = list(range(columns + 1))
+    column = list(range(columns + 1))
+    size = [0] * (columns + 1)
+    choice = [None] * (columns + 1)
+    for row in range(9):
+        for col in range(9):
+            for val in range(1, 10):
+                first = len(left)
+                for k, constraint in enumerate(_constraints(row, col, val)):
+                    header = constraint + 1
+                    node = first + k
+                    # link the node into the row, it is circular
+                    left.append(first + (k - 1) % 4)
+                    right.append(first + (k + 1) % 4)
+                    # link the node to the bottom of its column
+                    up.append(up[header])
+                    down.append(header)
+                    down[up[header]] = node
+                    up[header] = node
+                    column.append(header)
+                    size[header] += 1
+                    choice.append((row, col, val))
+    return left, right, up, down, column, size, choice
+
+_TEMPLATE = _build_template()
+
+class DLXSolver():
+    """
+    Solves Sudoku problems as an exact cover problem with Knuth's Dancing Links (Algorithm X)
+    It has the same surface as Solver so both can be used interchangeably
+    The matrix is built once and copied for every problem
+
+    Attributes
+    ----------
+    nodes: int
+        the number of choices tried during the last search
+
+    Staticmethods
+    -------------
+    has_unique_solution(board: list[list[int]]|np.ndarray((9,9), np.int8)) -> bool
+        checks if a given board has unique solutions
+    validate(grid: np.ndarray((9,9), np.int8)) -> bool
+        validates the solution
+
+    Methods
+    -------
+    solve(self, board: list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8)
+        solves the sudoku problem
+    count_solutions(self, board: list[list[int]]|np.ndarray((9,9), np.int8), limit: int = 2) -> int
+        counts the solutions of a board up to limit
+    search(self, board: list[list[int]]|np.ndarray((9,9), np.int8), limit: int) -> list
+        finds up to limit solutions
+    """
+    validate = staticmethod(Solver.validate)
+
+    def __init__(self):
+        self.nodes = 0
+
+    def solve(self, board: list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8):
+        """
+        Solves the given problem
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((9,9), np.int8)
+            the board to solve
+
+        Returns
+        -------
+        np.ndarray((9,9), np.int8)
+            the solved board or None if there is no solution
+        """
+        solutions = self.search(board, 1)
+        return solutions[0] if solutions else None
+
+    @staticmethod
+    def has_unique_solution(board: list[list[int]]|np.ndarray((9,9), np.int8)) -> bool:
+        """
+        Checks if a board has a unique solution
+        The search stops as soon as a second solution is found
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((9,9), np.int8)
+            the board to check
+
+        Returns
+        -------
+        bool
+            indicates if a board has a unique solution
+        """
+        return DLXSolver().count_solutions(board, 2) == 1
+
+    def count_solutions(self, board: list[list[int]]|np.ndarray((9,9), np.int8), limit: int = 2) -> int:
+        """
+        Counts the solutions of a board, stopping as soon as limit solutions are found
+        The number of search nodes visited is stored in self.nodes
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((9,9), np.int8)
+            the board to check
+        limit: int, optional, default: 2
+            the most solutions to count
+
+        Returns
+        -------
+        int
+            the number of solutions, at most limit
+        """
+        return len(self.search(board, limit))
+
+    def search(self, board: list[list[int]]|np.ndarray((9,9), np.int8), limit: int) -> list:
+        """
+        Finds the solutions of a board
+        A ValueError is raised if the board is not 9 by 9 or has a value outside 0 to 9, as Solver does
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((9,9), np.int8)
+            the board to solve
+        limit: int
+            the search stops once this many solutions are found
+
+        Returns
+        -------
+        list
+            the solutions found, each as a np.ndarray((9,9), np.int8)
+        """
+        grid = np.array(board)
+        # the same checks as Solver.prepare so both backends fail the same way
+        if grid.shape != (9,9):
+            raise ValueError("the dancing links solver only handles 9 by 9 boards")
+        if not ((grid <= 9).all() and (grid > -1).all()):
+            raise ValueError("the values of a board have to be from 0 to 9")
+        self.nodes = 0
+        self.left, self.right, self.up, self.down, self.column, self.size = (list(links) for links in _TEMPLATE[:6])
+        self.choice = _TEMPLATE[6]
+        # the given values are chosen before the search starts
+        # if a constraint of a given value is already covered then two givens clash
+        for row, values in enumerate(grid.tolist()):
+            for col, val in enumerate(values):
+                if val:
+                    for constraint in _constraints(row, col, int(val)):
+                        header = constraint + 1
+                        if self.right[self.left[header]] != header:
+                            return []
+                        self.cover(header)
+        solutions = []
+        self.__search(grid, limit, [], solutions)
+        return solutions
+
+    def __search(self, grid: np.ndarray((9,9), np.int8), limit: int, chosen: list, solutions: list) -> bool:
+        """
+        Algorithm X, covers the column with the fewest rows and tries each of its rows
+
+        Returns
+        -------
+        bool
+            whether or not the limit was reached
+        """
+        right, down, column, size = self.right, self.down, self.column, self.size
+        if right[0] == 0:
+            solution = np.array(grid)
+            for row, col, val in chosen:
+                solution[row, col] = val
+            solutions.append(solution)
+            return len(solutions) >= limit
+        # the column with the fewest rows gives the smallest branching factor
+        header, smallest = 0, 730
+        j = right[0]
+        while j != 0:
+            if size[j] < smallest:
+                header, smallest = j, size[j]
+                if smallest < 2:
+                    break
+            j = right[j]
+        if smallest == 0:
+            return False
+        self.cover(header)
+        node = down[header]
+        while node != header:
+            self.nodes += 1
+            chosen.append(self.choice[node])
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+            if self.__search(grid, limit, chosen, solutions):
+                return True
+            j = self.left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = self.left[j]
+            chosen.pop()
+            node = down[node]
+        self.uncover(header)
+        return False
+
+    def cover(self, header: int) -> None:
+        """
+        Removes a column and every row that satisfies it from the matrix
+
+        Parameters
+        ----------
+        header: int
+            the node of the column header
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header: int) -> None:
+        """
+        Puts back a column removed by cover, the links are restored in the reverse order
+
+        Parameters
+        ----------
+        header: int
+            the node of the column header
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+
+if __name__ == "__main__":
+    import generator
+    game = generator.Generator().generate()
+    Solver.print_board(game)
+    solver = DLXSolver()
+    res = solver.solve(game)
+    Solver.print_board(res)
+    print(DLXSolver.has_unique_solution(game))
+    print(DLXSolver.validate(res))
@@ -1,87 +1,223 @@
 from __future__ import annotations
 import numpy as np
 from random import choice
+from board import Board, Layout
+from candidates import Candidates
+from search import Search
+from strategies import mrv
 
 class Generator():
     """
     The Generator class generates and validates Sudoku boards
     There is no guarantee for uniqueness of the generated sudoku board
-    np.int8 is used because the numbers in the boards are always small (0 - 9)
+    np.int8 is used because the numbers in the boards are always small (0 - 25)
     This generator was used to test the solver
 
+    Attributes
+    ----------
+    strategy: function
+        chooses the next cell to fill during the search, see strategies.py
+    layout: Layout
+        the tables of the boards generated, 9 by 9 unless another box size is given
+    nodes: int
+        the number of values placed during the last search
+
     Staticmethods
     -------------
-    print_board(board: list[list]|np.ndarray((9,9), np.int8)) -> None
+    print_board(board: list[list]|np.ndarray((size,size), np.int8)) -> None
         prints the generated board in a stylized manner
     
     Methods
     -------
-    generate(self) -> np.ndarray((9,9), np.int8)
+    generate(self) -> np.ndarray((size,size), np.int8)
         generates a sudoku board
-    populate(self, grid: np.ndarray((9,9), np.int8) -> bool
+    populate(self, grid: np.ndarray((size,size), np.int8), masks: Candidates = None, propagate = None) -> bool
         populates an empty game board
-    next_empty_cell(self, grid: np.ndarray((9,9), np.int8), row_by_row = False) -> tuple
+    full_grids(self, count: int, seed: int = None, base: np.ndarray((size,size), np.int8) = None) -> np.ndarray((count,size,size), np.int8)
+        makes many full grids at once by shuffling a full grid
+    pattern_grid(self) -> np.ndarray((size,size), np.int8)
+        makes a full grid from a formula
+    assign(self, grid: Board, masks: Candidates, cell: int, val: int) -> None
+        places a value and records it on the trail
+    undo(self, grid: Board, masks: Candidates, mark: int) -> None
+        removes the values placed since the trail had mark entries
+    next_empty_cell(self, grid: np.ndarray((size,size), np.int8), row_by_row = False) -> tuple
         finds the next empty cell in the game board
-    is_valid(self, grid: np.ndarray((9,9), np.int8), val: int, position: tuple) -> bool
+    is_valid(self, grid: np.ndarray((size,size), np.int8), val: int, position: tuple) -> bool
         checks if the intended move (insertion) is a valid one
-    __in_box(self, grid: np.ndarray((9,9), np.int8), val: int, position: tuple) -> bool:
-        checks if a number is in the 3 * 3 sub grid
-    clear_blocks(self, grid: np.ndarray((9,9), np.int8), num_to_clear: int) -> None
+    __in_box(self, grid: np.ndarray((size,size), np.int8), val: int, position: tuple) -> bool:
+        checks if a number is in the box of the position
+    clear_blocks(self, grid: np.ndarray((size,size), np.int8), num_to_clear: int) -> None
         clears a random number of boxes
     """
-    def generate(self) -> np.ndarray((9,9), np.int8):
+    def __init__(self, strategy = mrv, box: int = 3):
+        """
+        Parameters
+        ----------
+        strategy: function, optional, default: mrv
+            chooses the next cell to fill, it takes the grid and its masks and returns a cell index
+        box: int, optional, default: 3
+            the number of rows of a box, 3 gives 9 by 9 boards, 4 gives 16 by 16 and 5 gives 25 by 25
+        """
+        self.strategy = strategy
+        self.layout = Layout.of(box * box)
+        self.nodes = 0
+
+    def generate(self) -> np.ndarray((size,size), np.int8):
         """
         Generates a Sudoku board
 
         Returns
         -------
-        a numpy array with shape (9,9) ie a 9 by 9 array
+        a numpy array with shape (size,size) eg a 9 by 9 array
         """
-        grid = np.zeros((9,9), dtype=np.int8)
+        size, area = self.layout.size, self.layout.area
+        grid = np.zeros((size,size), dtype=np.int8)
         # once fully populated, clear some cells
-        grid[np.random.randint(0, 9), np.random.randint(0, 9)] = np.random.randint(1, 10)
+        grid[np.random.randint(0, size), np.random.randint(0, size)] = np.random.randint(1, size + 1)
         if self.populate(grid):
             # the more the empty cells, the more likely that there would be duplicate solutions
             # tweaking this number affects the performance of the code
-            self.clear_blocks(grid, np.random.randint(35,57))
+            # it is between 35 and 57 cells on a 9 by 9 board and the same share of the cells on a bigger one
+            self.clear_blocks(grid, np.random.randint(35 * area // 81, 57 * area // 81))
         return grid
 
-    def populate(self, grid: np.ndarray((9,9), np.int8)) -> bool:
+    def populate(self, grid: np.ndarray((size,size), np.int8), masks: Candidates = None, propagate = None) -> bool:
         """
         Populates the sudoku board from scratch
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid to populate
+        masks: Candidates, optional, default: None
+            the masks of the grid, they are kept in sync with every insertion
+        propagate: function, optional, default: None
+            called after every insertion as propagate(grid, masks), eg Solver.propagate which makes
+            the 25 by 25 boards far quicker to fill
 
         Returns
         -------
         returns True if it was successful else False
         """
-        pos = self.next_empty_cell(grid)
-        # if there are no more empty cells then we are done
-        if not pos:
-            return True
-        i, j = pos
-        available = np.arange(1, 10)
-        #shuffling ensures that a unique grid is generated each time
-        np.random.shuffle(available)
-        for curr in available:
-            if self.is_valid(grid, curr, (i,j)):
-                grid[i, j] = curr
-                if self.populate(grid):
-                    return True
-            grid[i, j] = 0
-        return False
-
-    def next_empty_cell(self, grid: np.ndarray((9,9), np.int8), row_by_row: bool = False) -> tuple:
+        board = Board.from_array(grid)
+        if masks is None:
+            masks = Candidates(board)
+        # an unlucky order can send the search into a dead end that takes forever to back out of on the bigger boards
+        # so after a number of nodes it starts again with new orders, the number doubles every time so it always ends
+        budget = 4 * board.layout.area
+        while True:
+            #shuffling ensures that a unique grid is generated each time
+            # the order of every cell is drawn at once rather than for every value tried
+            orders = (np.argsort(np.random.random((board.layout.area, board.layout.size)), axis=1) + 1).tolist()
+            search = Search(self, board, masks, orders.__getitem__, propagate)
+            if search.next_solution(self.nodes + budget):
+                grid[:] = board.array
+                return True
+            if search.finished:
+                return False
+            search.abandon()
+            budget *= 2
+
+    def full_grids(self, count: int, seed: int = None, base: np.ndarray((size,size), np.int8) = None) -> np.ndarray((count,size,size), np.int8):
+        """
+        Makes many full grids at once, far faster than populating them one at a time
+        Every grid is the base grid with its values relabeled, its bands (rows of boxes), the rows in every band,
+        its stacks (columns of boxes) and the columns in every stack shuffled and maybe transposed
+        None of these can break a full grid so nothing is checked or searched, the whole batch is a few numpy operations
+        The grids are all equivalent to the base, pass a base from populate for grids that are not related to each other
+
+        Parameters
+        ----------
+        count: int
+            the number of grids to make
+        seed: int, optional, default: None
+            the seed of the random numbers, the same seed and base always give the same grids
+        base: np.ndarray((size,size), np.int8), optional, default: None
+            the full grid to shuffle, if None the pattern grid is used
+
+        Returns
+        -------
+        np.ndarray((count,size,size), np.int8)
+            the full grids
+        """
+        box, size = self.layout.box_size, self.layout.size
+        base = self.pattern_grid() if base is None else np.asarray(base, dtype=np.int8)
+        rng = np.random.default_rng(seed)
+        def order() -> np.ndarray:
+            # a random order of the bands and of the rows in each band, as the row that goes in every place
+            bands = rng.random((count, box)).argsort(axis=1)
+            inner = rng.random((count, box, box)).argsort(axis=2)
+            return (bands[:, :, None] * box + inner).reshape((count, size))
+        rows, cols = order(), order()
+        grids = base[rows[:, :, None], cols[:, None, :]]
+        flip = rng.random(count) < 0.5
+        grids[flip] = grids[flip].transpose((0, 2, 1))
+        # labels[i, val] is the new value of val in grid i
+        labels = np.zeros((count, size + 1), dtype=np.int8)
+        labels[:, 1:] = rng.random((count, size)).argsort(axis=1) + 1
+        return np.take_along_axis(labels, grids.reshape((count, -1)), axis=1).reshape((count, size, size))
+
+    def pattern_grid(self) -> np.ndarray((size,size), np.int8):
+        """
+        Makes a full grid from a formula, every row is the row above shifted by a box
+        and every band is the band above shifted by one
+
+        Returns
+        -------
+        np.ndarray((size,size), np.int8)
+            the full grid
+        """
+        box, size = self.layout.box_size, self.layout.size
+        row, col = np.indices((size, size))
+        return ((box * (row % box) + row // box + col) % size + 1).astype(np.int8)
+
+    def assign(self, grid: Board, masks: Candidates, cell: int, val: int) -> None:
+        """
+        Places a value in the grid and records it on the trail of the masks
+
+        Parameters
+        ----------
+        grid: Board
+            the grid being solved
+        masks: Candidates
+            the masks of the grid
+        cell: int
+            the cell of insertion
+        val: int
+            the value to insert
+        """
+        grid.cells[cell] = val
+        masks.place(cell, val)
+        masks.trail.append((cell, val))
+
+    def undo(self, grid: Board, masks: Candidates, mark: int) -> None:
+        """
+        Removes every value placed since the trail was mark entries long, most recent first
+
+        Parameters
+        ----------
+        grid: Board
+            the grid being solved
+        masks: Candidates
+            the masks of the grid
+        mark: int
+            the length of the trail to go back to
+        """
+        trail = masks.trail
+        cells = grid.cells
+        while len(trail) > mark:
+            cell, val = trail.pop()
+            masks.unplace(cell, val)
+            cells[cell] = 0
+
+    def next_empty_cell(self, grid: np.ndarray((size,size), np.int8), row_by_row: bool = False) -> tuple:
         """
         finds the next empy cell, denoted by a cell whose value is 0
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8
+        grid: np.ndarray((size,size), np.int8
             the grid to search
         row_by_row: bool, optional, default: False
             indicates whether to move row by row or column by column
@@ -99,13 +235,13 @@ class Generator():
                     return pos
         return ()
 
-    def is_valid(self, grid: np.ndarray((9,9), np.int8), val: int, position: tuple) -> bool:
+    def is_valid(self, grid: np.ndarray((size,size), np.int8), val: int, position: tuple) -> bool:
         """
         Checks if a it is valid to place the in the position
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being worked on
         val: int
             the value to be inserted
@@ -126,14 +262,14 @@ class Generator():
         return not result
  
 
-    def __in_box(self, grid: np.ndarray((9,9), np.int8), val: int, position: tuple) -> bool:
+    def __in_box(self, grid: np.ndarray((size,size), np.int8), val: int, position: tuple) -> bool:
         """
         Checks if is in the current box
         Note: a box is a 3 by 3 grid
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being worked on
         val: int
             the value to be inserted
@@ -146,69 +282,67 @@ class Generator():
             indicates whether the passed value is in the subgrid
         """
         row, column = position
-        # gets the row and column of the first elemnt in the box
-        box_start_row = row - row % 3
-        box_start_column = column - column % 3 
-        for i in range(box_start_row, box_start_row + 3):
-            for j in range(box_start_column, box_start_column + 3):
-                if val == grid[i, j]:
-                    return True
-        return False
+        # the cells of the box come from the shared table instead of the box start arithmetic
+        layout = Layout.of(len(grid))
+        return val in grid.ravel()[layout.units[2 * layout.size + layout.box[layout.size * row + column]]]
 
-    def clear_blocks(self, grid: np.ndarray((9,9), np.int8), num_to_clear: int) -> None:
+    def clear_blocks(self, grid: np.ndarray((size,size), np.int8), num_to_clear: int) -> None:
         """
         removes random cells in place
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being worked on
         num_to_clear: int
             the number of cells to clear
         """
         # a set of all possible coordinates
-        coordinates = {(i,j) for i in range(9) for j in range(9)}
+        coordinates = {(i,j) for i in range(len(grid)) for j in range(len(grid))}
         for _ in range(num_to_clear):
             val = choice(list(coordinates))
             coordinates.remove(val)
             grid[val[0], val[1]] = 0
 
     @staticmethod
-    def print_board(board: list[list[int]]|np.ndarray((9,9), np.int8)) -> None:
+    def print_board(board: list[list[int]]|np.ndarray((size,size), np.int8)) -> None:
         """
         Displays the board and its content
         if the value is 0, it displays a figure width space
+        values above 9 are displayed as letters, A for 10, B for 11 and so on
 
         Parameters
         ----------
-        board: list[list[int]]|np.ndarray((9,9), np.int8)
+        board: list[list[int]]|np.ndarray((size,size), np.int8)
             the board to be printed
         """
+        size = len(board)
+        box = Layout.of(size).box_size
         # this is quite stylized and was gotten through lots of trial and error
         # the unicode characters are box character
         char = "\u2533\u2501\u2501\u2501"
         for i, row in enumerate(board):
             if i > 0:
-                if i %3 == 0 :
+                if i % box == 0 :
                     char = "\u254b\u2501\u2501\u2501"
                 else:
                     char = "\u254b\u2504\u2504\u2504"
-            print(" ", char * 9, char[0], sep="" )
+            print(" ", char * size, char[0], sep="" )
             for j, col in enumerate(row):
                 terminating = " \u2506 "
-                if j%3 == 0:
+                if j % box == 0:
                     print(' \u2503 ', end="")
-                if j == 8:
+                if j == size - 1:
                     terminating = " \u2503 "
-                elif (j + 1) % 3 == 0:
+                elif (j + 1) % box == 0:
                     terminating = ""
                 if col == 0:
                     print("\u2007", end=terminating)
                 else:
-                    print(col, end=terminating)
+                    print(col if col < 10 else chr(ord("A") + col - 10), end=terminating)
             print()
         char = "\u253b\u2501\u2501\u2501"
-        print(" ", char * 9, char[0], sep = "")
+        print(" ", char * size, char[0], sep = "")
 
 if __name__ == "__main__":
     a = Generator()
@@ -18,6 +18,7 @@ notes= {} # stores the notes
 FPS = 60 # frames per second
 clock = pg.time.Clock()
 insert_mode = True # the two modes are insert mode and note mode
+solve_speed = 16 # the steps of the solver shown per second when space is hit, up and down change it
 
 screensize = 500, 650
 background_color = (0,0,0)
@@ -267,56 +268,95 @@ def complete():
     sys.exit()
 
 def solve():
+    """
+    Shows the solver filling the grid, the steps are drawn at solve_speed steps per second
+    Up and down double or halve the speed, the steps that come between two frames are not drawn on their own
+    Only the cells changed since the last frame are drawn again
+    """
+    global solve_speed
     notes.clear()
     wrong.clear()
     grid.current_state =  np.array(grid.initial_state)
     draw_background()
     draw_numbers()
-    solver = Solver()
-    candidates = solver.get_candidates(grid.current_state)
-    if fill(solver, grid.current_state, solver.cache_values(grid.current_state, candidates)[0]):
-        assert solver.validate(grid.current_state)
-        pg.time.delay(2000)
-        sys.exit()
-    
-def fill(solver, grid, cache):
-    for event in pg.event.get():
-        if event.type == pg.QUIT:
+    pg.display.flip()
+    steps = Solver().trace(grid.current_state)
+    due = 0 # the number of steps that should have been drawn by now
+    last = None # the last step that changed a cell, its cell is outlined
+    outlined = None # the cell outlined on the screen
+    solved = False
+    while True:
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                sys.exit()
+            if event.type == pg.KEYDOWN and event.key == pg.K_UP:
+                solve_speed = min(solve_speed * 2, 100000)
+            if event.type == pg.KEYDOWN and event.key == pg.K_DOWN:
+                solve_speed = max(solve_speed // 2, 1)
+        due += solve_speed * clock.tick(FPS) / 1000
+        changed = set()
+        while due >= 1 and not solved:
+            due -= 1
+            step = next(steps, None)
+            if step is None:
+                return
+            # the trace does not touch the grid so the steps are replayed on it here
+            if step.kind in ("place", "propagate"):
+                grid.current_state[step.pos] = step.val
+            elif step.kind in ("remove", "backtrack"):
+                grid.current_state[step.pos] = 0
+            if step.kind == "solved":
+                solved = True
+            else:
+                changed.add(step.pos)
+                last = step
+        if changed:
+            # the last value placed is outlined in yellow and the last value taken back in red
+            if outlined is not None:
+                changed.add(outlined)
+            outlined = last.pos
+            color = (255, 255, 0) if last.kind in ("place", "propagate") else (255, 0, 0)
+            pg.display.update([draw_cell(pos, color if pos == outlined else None) for pos in changed])
+        if solved:
+            assert Solver.validate(grid.current_state)
+            pg.time.delay(2000)
             sys.exit()
-    pos = solver.next_empty_cell(grid, row_by_row = True)
-    if not pos:
-        return True
-    x, y = pos
-    # rather than going thrugh to see if there are any other solutions
-    available = cache[pos]
-    for i in available:
-        if solver.is_valid(grid, i, pos):
-            grid[x][y] = i
-            draw_background()
-            draw_numbers()
-            topleftrad, toprightrad, buttomleftrad, buttomrightrad = -1, -1, -1, -1
-            if x == 0 and y == 0:
-                topleftrad = 20
-            elif x == 0 and y == 8:
-                toprightrad = 20
-            elif x == 8 and y == 0:
-                buttomleftrad = 20
-            elif x == 8 and y == 8:
-                buttomrightrad = 20
-            pg.draw.rect(screen, (255, 255, 0), pg.Rect(y * 50 + 25, x * 50 + 25, 50, 50), 3,\
-                border_top_left_radius=topleftrad, border_top_right_radius=toprightrad,\
-                    border_bottom_left_radius=buttomleftrad, border_bottom_right_radius=buttomrightrad)
-            pg.display.flip()
-            pg.time.delay(75)
-            if fill(solver, grid, cache):
-                return True
-            pg.draw.rect(screen, (255, 0, 0), pg.Rect(y * 50 + 25, x * 50 + 25, 50, 50), 3,\
-                border_top_left_radius=topleftrad, border_top_right_radius=toprightrad,\
-                    border_bottom_left_radius=buttomleftrad, border_bottom_right_radius=buttomrightrad)
-            pg.display.flip()
-            pg.time.delay(50)
-            grid[x][y] = 0
-    return False
+
+def draw_cell(pos: tuple, color: tuple = None) -> pg.Rect:
+    """
+    Draws one cell again, only inside its lines so that the lines are left as they are
+
+    Parameters
+    ----------
+    pos: tuple
+        the row and column of the cell
+    color: tuple, optional, default: None
+        if given, the cell is outlined in this color
+
+    Returns
+    -------
+    pg.Rect
+        the area drawn, to be passed to pg.display.update
+    """
+    i, j = pos
+    # the corners of the grid are rounded so the cells there are too
+    radii = {"border_top_left_radius": -1, "border_top_right_radius": -1,
+        "border_bottom_left_radius": -1, "border_bottom_right_radius": -1}
+    corner = {(0, 0): "border_top_left_radius", (0, 8): "border_top_right_radius",
+        (8, 0): "border_bottom_left_radius", (8, 8): "border_bottom_right_radius"}.get((i, j))
+    if corner:
+        radii[corner] = RADIUS - 4
+    area = pg.Rect(j * 50 + 25 + 4, i * 50 + 25 + 4, 42, 42)
+    pg.draw.rect(screen, background_color, area, **radii)
+    val = grid.current_state[i][j]
+    if val != 0:
+        # the numbers of the problem are white and the ones filled in green, as in draw_numbers
+        text_color = (255,255,255) if grid.initial_state[i][j] != 0 else (150,255,150)
+        text = my_font.render(str(val), True, text_color)
+        screen.blit(text, ((j + 1) * 50 - 7, (i + 1) * 50 - 12))
+    if color is not None:
+        pg.draw.rect(screen, color, area, 3, **radii)
+    return area
 
 
 def game_loop():
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import collections
+import numpy as np
+import os
+import threading
+from puzzle_io import from_string, to_string
+from solver import Solver
+
+# the file the default pool is kept in between runs
+POOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_pool.txt")
+
+class PuzzlePool():
+    """
+    Keeps a number of unique puzzles and their solutions ready to be used
+    A background thread generates new puzzles whenever one is taken
+    and the pool is saved to a file so the puzzles are ready on the next run
+    Each line of the file is the problem and its solution as 81 character strings separated by a space
+
+    Attributes
+    ----------
+    size: int
+        the number of puzzles kept ready
+    path: str
+        the file the pool is saved to, if None it is not saved
+    puzzles: collections.deque
+        the (problem, solution) pairs that are ready
+
+    Classmethods
+    ------------
+    default() -> PuzzlePool
+        the pool shared by every Sudoku
+
+    Methods
+    -------
+    pop(self) -> tuple
+        takes a puzzle from the pool
+    load(self) -> None
+        reads the puzzles saved in the file
+    save(self) -> None
+        writes the puzzles to the file
+    close(self) -> None
+        stops the background thread
+    """
+    _default = None
+
+    def __init__(self, size: int = 10, path: str = POOL_FILE):
+        """
+        Parameters
+        ----------
+        size: int, optional, default: 10
+            the number of puzzles kept ready
+        path: str, optional, default: POOL_FILE
+            the file the pool is saved to, if None it is not saved
+        """
+        self.size = size
+        self.path = path
+        self.puzzles = collections.deque()
+        self.load()
+        self.__wanted = threading.Event()
+        self.__closed = False
+        self.__worker = threading.Thread(target=self.__refill, daemon=True)
+        self.__worker.start()
+        self.__wanted.set()
+
+    @classmethod
+    def default(cls) -> PuzzlePool:
+        """
+        Gets the pool shared by every Sudoku, it is created the first time it is needed
+
+        Returns
+        -------
+        PuzzlePool
+            the default pool
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def pop(self) -> tuple:
+        """
+        Takes a puzzle from the pool and asks the background thread for a new one
+        If the pool is empty, a puzzle is generated straight away
+
+        Returns
+        -------
+        tuple (np.ndarray((9,9), np.int8), np.ndarray((9,9), np.int8))
+            the problem and its solution
+        """
+        try:
+            puzzle = self.puzzles.popleft()
+        except IndexError:
+            puzzle = self.__generate()
+        self.__wanted.set()
+        return puzzle
+
+    def load(self) -> None:
+        """
+        Reads the puzzles saved in the file, lines that cannot be read are skipped
+        The file can be edited by hand so a puzzle is also skipped unless it has one solution and it is the one saved
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        solver = Solver()
+        with open(self.path) as lines:
+            for line in lines:
+                try:
+                    problem, solution = (from_string(board) for board in line.split())
+                except ValueError:
+                    continue
+                found = []
+                if solver.count_solutions(problem, 2, solutions=found) != 1 or not (found[0] == solution).all():
+                    continue
+                self.puzzles.append((problem, solution))
+                if len(self.puzzles) >= self.size:
+                    break
+
+    def save(self) -> None:
+        """Writes the puzzles to the file, the file is replaced at once so it is never half written"""
+        if not self.path:
+            return
+        temp = self.path + ".tmp"
+        with open(temp, "w") as lines:
+            for problem, solution in list(self.puzzles):
+                lines.write(f"{to_string(problem)} {to_string(solution)}\n")
+        os.replace(temp, self.path)
+
+    def close(self) -> None:
+        """Stops the background thread once it finishes the puzzle it is working on"""
+        self.__closed = True
+        self.__wanted.set()
+        self.__worker.join()
+
+    def __generate(self) -> tuple:
+        # the number of clues is in the same range the old random clearing gave
+        return Solver().generate_unique(clues=np.random.randint(25, 47))
+
+    def __refill(self) -> None:
+        """Waits until a puzzle is taken then generates puzzles until the pool is full again"""
+        while True:
+            self.__wanted.wait()
+            self.__wanted.clear()
+            if self.__closed:
+                return
+            # save first so a puzzle that was taken is not given again on the next run
+            self.save()
+            while len(self.puzzles) < self.size and not self.__closed:
+                self.puzzles.append(self.__generate())
+                self.save()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import numpy as np
+import sys
+from typing import Iterable, Iterator, TextIO
+
+# Puzzles are stored one per line as 81 characters, row by row
+# empty cells can be written as 0 or . and lines starting with # are comments
+# everything here works line by line so files of any size are read and written in constant memory
+
+def to_string(board: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> str:
+    """
+    Serializes a board as 81 characters, row by row, with 0 for the empty cells
+
+    Parameters
+    ----------
+    board: str|list[list[int]]|np.ndarray((9,9), np.int8)
+        the board to serialize, strings are returned as they are
+
+    Returns
+    -------
+    str
+        the 81 character string
+    """
+    if isinstance(board, str):
+        return board
+    return "".join(map(str, np.asarray(board).ravel().tolist()))
+
+def from_string(line: str) -> np.ndarray((9,9), np.int8):
+    """
+    Parses an 81 character string, 0 or . are empty cells
+
+    Parameters
+    ----------
+    line: str
+        the 81 character string
+
+    Returns
+    -------
+    np.ndarray((9,9), np.int8)
+        the board
+    """
+    line = line.strip().replace(".", "0")
+    if len(line) != 81 or not line.isdigit():
+        raise ValueError(f"a puzzle must be 81 digits or dots, got {line!r}")
+    return (np.frombuffer(line.encode(), dtype=np.uint8) - ord("0")).astype(np.int8).reshape((9,9))
+
+def read_puzzles(source: str|TextIO = "-") -> Iterator[np.ndarray((9,9), np.int8)]:
+    """
+    Lazily reads the puzzles of a file, one line at a time
+    Blank lines and comments are skipped
+
+    Parameters
+    ----------
+    source: str|TextIO, optional, default: "-"
+        the path of the file, an open file, or "-" for stdin
+
+    Yields
+    ------
+    np.ndarray((9,9), np.int8)
+        the puzzles in the order of the file, ready to be passed to Solver.solve
+    """
+    if isinstance(source, str) and source != "-":
+        with open(source) as lines:
+            yield from read_puzzles(lines)
+        return
+    for line in (sys.stdin if source == "-" else source):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield from_string(line)
+
+def write_solutions(solutions: Iterable, dest: str|TextIO = "-") -> int:
+    """
+    Writes the solutions one per line as they are produced
+    An unsolved board (None) is written as an empty line so that lines match the puzzles
+
+    Parameters
+    ----------
+    solutions: Iterable
+        the solutions, each a np.ndarray((9,9), np.int8), an 81 character string or None
+    dest: str|TextIO, optional, default: "-"
+        the path of the file, an open file, or "-" for stdout
+
+    Returns
+    -------
+    int
+        the number of lines written
+    """
+    if isinstance(dest, str) and dest != "-":
+        with open(dest, "w") as lines:
+            return write_solutions(solutions, lines)
+    out = sys.stdout if dest == "-" else dest
+    count = 0
+    for solution in solutions:
+        out.write((to_string(solution) if solution is not None else "") + "\n")
+        count += 1
+    out.flush()
+    return count
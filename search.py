@@ -0,0 +1,165 @@
+from __future__ import annotations
+from time import monotonic
+from board import Board
+from candidates import Candidates
+
+class Search():
+    """
+    A depth first search over the empty cells of a grid, kept on an explicit stack rather than recursion
+    The frames are allocated once, one per empty cell, so trying a value costs no function call or allocation
+    The search stops at every solution and carries on from there the next time it is asked,
+    this means it can be paused and resumed at any time
+    It also stops when it runs out of nodes or time, the stack is left as it was so asking again carries on
+
+    Attributes
+    ----------
+    engine: Generator
+        the generator or solver searching, its strategy, assign, undo, nodes and stats are used
+    grid: Board
+        the grid being filled
+    masks: Candidates
+        the masks of the grid
+    values: function
+        takes a cell and returns the values to try there, in order
+    propagate: function
+        called after every insertion as propagate(grid, masks), a False result means the branch is dead
+    depth: int
+        the number of frames on the stack
+    finished: bool
+        whether or not every branch was searched
+
+    Methods
+    -------
+    next_solution(self, max_nodes: int = None, deadline: float = None) -> bool
+        carries on until the grid is full or the budget runs out
+    push(self, cell: int) -> None
+        puts a cell on the stack
+    abandon(self) -> None
+        takes back every value placed by the search
+    """
+
+    def __init__(self, engine, grid: Board, masks: Candidates, values, propagate = None):
+        """
+        Parameters
+        ----------
+        engine: Generator
+            the generator or solver searching
+        grid: Board
+            the grid being filled
+        masks: Candidates
+            the masks of the grid
+        values: function
+            takes a cell and returns the values to try there, the ones not allowed by the masks are skipped
+        propagate: function, optional, default: None
+            called after every insertion as propagate(grid, masks)
+        """
+        self.engine = engine
+        self.grid = grid
+        self.masks = masks
+        self.values = values
+        self.propagate = propagate
+        # a frame for every empty cell: the cell, its values, the next value to try,
+        # the length of the trail before the cell was filled and the value in the cell
+        size = len(masks.empty) + 1
+        self.cells = [None] * size
+        self.options = [None] * size
+        self.index = [0] * size
+        self.marks = [0] * size
+        self.tried = [0] * size
+        self.depth = 0
+        self.started = False
+        self.finished = False
+
+    def next_solution(self, max_nodes: int = None, deadline: float = None) -> bool:
+        """
+        Carries on searching until the grid is full
+        The grid is left full, calling this again takes back the last value and finds the next solution
+
+        Parameters
+        ----------
+        max_nodes: int, optional, default: None
+            stop once engine.nodes reaches this many, if None there is no limit
+        deadline: float, optional, default: None
+            stop once time.monotonic() passes this, it is checked every 256 nodes, if None there is no limit
+
+        Returns
+        -------
+        bool
+            True if a solution was found, False if there are no more or the budget ran out
+            finished tells the two apart, an unfinished search can be carried on by calling this again
+        """
+        if self.finished:
+            return False
+        engine, grid, masks = self.engine, self.grid, self.masks
+        stats = getattr(engine, "stats", None)
+        pos = grid.layout.pos
+        if not self.started:
+            self.started = True
+            cell = engine.strategy(grid, masks)
+            # a full grid is a solution, the next call finds the stack empty
+            if cell is None:
+                return True
+            self.push(cell)
+        cells, options, index, marks, tried = self.cells, self.options, self.index, self.marks, self.tried
+        while self.depth:
+            # stopping here leaves the last value tried in place, it is taken back when the search carries on
+            if max_nodes is not None and engine.nodes >= max_nodes:
+                return False
+            if deadline is not None and not engine.nodes & 255 and monotonic() >= deadline:
+                return False
+            frame = self.depth - 1
+            cell = cells[frame]
+            # take back the value tried last time with everything it led to
+            if tried[frame]:
+                engine.undo(grid, masks, marks[frame])
+                if stats is not None:
+                    stats.backtrack(pos[cell], tried[frame])
+                tried[frame] = 0
+            values = options[frame]
+            allowed = masks.mask(cell)
+            i = index[frame]
+            while i < len(values) and not allowed & (1 << (values[i] - 1)):
+                i += 1
+            if i == len(values):
+                # every value was tried so go back to the previous cell
+                self.depth -= 1
+                continue
+            val = values[i]
+            index[frame] = i + 1
+            tried[frame] = val
+            engine.nodes += 1
+            if stats is not None:
+                stats.node(pos[cell], val)
+            engine.assign(grid, masks, cell, val)
+            if self.propagate is not None and not self.propagate(grid, masks):
+                continue
+            cell = engine.strategy(grid, masks)
+            if cell is None:
+                return True
+            self.push(cell)
+        self.finished = True
+        return False
+
+    def push(self, cell: int) -> None:
+        """
+        Puts a cell on the stack
+
+        Parameters
+        ----------
+        cell: int
+            the empty cell to fill next
+        """
+        frame = self.depth
+        self.cells[frame] = cell
+        self.options[frame] = self.values(cell)
+        self.index[frame] = 0
+        self.marks[frame] = len(self.masks.trail)
+        self.tried[frame] = 0
+        self.depth += 1
+
+    def abandon(self) -> None:
+        """Takes back every value placed by the search and stops it"""
+        if self.depth:
+            self.engine.undo(self.grid, self.masks, self.marks[0])
+        self.depth = 0
+        self.finished = True
@@ -0,0 +1,359 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import numpy as np
+import os
+from time import perf_counter
+from puzzle_io import from_string, to_string
+from solver import Pending, Solver
+
+# An asyncio server that solves puzzles in a pool of processes so the event loop is never blocked by a search
+# The protocol is one JSON object per line over TCP or a unix socket, run with --help for the options
+# a request is {"id": 1, "puzzle": "81 characters"} and the response to it is
+# {"id": 1, "solution": "81 characters", "unique": true, "solve_seconds": 0.001, "total_seconds": 0.002}
+# the solution is null if there is none, an "error" is sent instead for a bad request or a search over budget
+# unique is null when the budget ran out after the solution was found but before a second one was ruled out
+# the responses of a connection come back as they are ready so they are matched to the requests by id
+
+class SolverService():
+    """
+    Solves the puzzles sent over a socket in a pool of processes
+    The puzzles that arrive together are sent to a process as one batch so a process is not woken for every puzzle
+    Once queue_size puzzles are waiting, the connections are not read until there is room again,
+    this pushes back on the clients rather than letting the queue grow without limit
+
+    Attributes
+    ----------
+    workers: int
+        the number of processes, it defaults to the number of cores
+    batch_size: int
+        the most puzzles sent to a process at once
+    batch_delay: float
+        the seconds to wait for more puzzles once one arrives
+    max_nodes: int
+        the most values a search can try before it is given up, if None there is no limit
+    queue: asyncio.Queue
+        the puzzles waiting to be sent to a process with the future of their result
+
+    Methods
+    -------
+    start(self, host: str = "127.0.0.1", port: int = 0, path: str = None) -> asyncio.Server
+        starts listening
+    solve(self, puzzle: str) -> dict
+        solves a puzzle in the pool
+    close(self) -> None
+        stops the batching and the processes
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = 64, batch_delay: float = 0.002, queue_size: int = 1024,
+            max_nodes: int = None):
+        """
+        Parameters
+        ----------
+        workers: int, optional, default: None
+            the number of processes, it defaults to the number of cores
+        batch_size: int, optional, default: 64
+            the most puzzles sent to a process at once
+        batch_delay: float, optional, default: 0.002
+            the seconds to wait for more puzzles once one arrives
+        queue_size: int, optional, default: 1024
+            the most puzzles waiting before the connections stop being read
+        max_nodes: int, optional, default: None
+            the most values a search can try before it is given up, if None there is no limit
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = concurrent.futures.ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(max_nodes,))
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_nodes = max_nodes
+        self.queue = asyncio.Queue(queue_size)
+        # only as many batches as processes are handed over at once, the rest wait in the queue
+        self.__running = asyncio.Semaphore(self.workers)
+        self.__batcher = None
+        # the batches handed over, kept so their tasks are not dropped before they finish
+        self.__batches = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str = None) -> asyncio.Server:
+        """
+        Starts listening, the server is returned so the caller can find its address and serve it
+
+        Parameters
+        ----------
+        host: str, optional, default: "127.0.0.1"
+            the address to listen on
+        port: int, optional, default: 0
+            the port to listen on, 0 picks a free one
+        path: str, optional, default: None
+            if given, listen on this unix socket instead of host and port
+
+        Returns
+        -------
+        asyncio.Server
+            the server listening
+        """
+        if self.__batcher is None:
+            self.__batcher = asyncio.create_task(self.__batch())
+        if path is not None:
+            return await asyncio.start_unix_server(self.__serve, path)
+        return await asyncio.start_server(self.__serve, host, port)
+
+    async def solve(self, puzzle: str) -> dict:
+        """
+        Solves a puzzle in the pool, it waits while the queue is full
+
+        Parameters
+        ----------
+        puzzle: str
+            the puzzle as 81 characters
+
+        Returns
+        -------
+        dict
+            the solution, whether it is unique and the seconds taken by the search and in total
+        """
+        if self.__batcher is None:
+            self.__batcher = asyncio.create_task(self.__batch())
+        start = perf_counter()
+        # a bad puzzle raises here rather than failing the whole batch it would be sent with
+        puzzle = to_string(from_string(puzzle))
+        result = asyncio.get_running_loop().create_future()
+        await self.queue.put((puzzle, result))
+        response = await result
+        response["total_seconds"] = perf_counter() - start
+        return response
+
+    async def close(self) -> None:
+        """Stops the batching and the processes"""
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            self.__batcher = None
+        # the processes are waited for in a thread so the event loop carries on meanwhile
+        await asyncio.to_thread(self.executor.shutdown, cancel_futures=True)
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # every request is answered by its own task so a slow puzzle does not hold up the ones after it
+        pending = set()
+        try:
+            while line := await reader.readline():
+                request = None
+                try:
+                    request = json.loads(line)
+                    puzzle = to_string(from_string(request["puzzle"]))
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    writer.write(_encode({"id": request.get("id") if isinstance(request, dict) else None, "error": str(error)}))
+                    continue
+                start = perf_counter()
+                result = asyncio.get_running_loop().create_future()
+                # waiting for room in the queue stops this connection from being read, that is the backpressure
+                await self.queue.put((puzzle, result))
+                task = asyncio.create_task(self.__respond(writer, request.get("id"), result, start))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        except ConnectionError:
+            # the client went away, whatever it was waiting for is dropped
+            pass
+        finally:
+            writer.close()
+
+    async def __respond(self, writer: asyncio.StreamWriter, id, result: asyncio.Future, start: float) -> None:
+        response = dict(await result, id=id, total_seconds=perf_counter() - start)
+        if not writer.is_closing():
+            writer.write(_encode(response))
+            await writer.drain()
+
+    async def __batch(self) -> None:
+        # takes the puzzles off the queue in batches, a batch is sent as soon as it is full or batch_delay has passed
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+            await self.__running.acquire()
+            task = asyncio.create_task(self.__run(batch))
+            self.__batches.add(task)
+            task.add_done_callback(self.__batches.discard)
+
+    async def __run(self, batch: list) -> None:
+        try:
+            responses = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _solve_batch, [puzzle for puzzle, _ in batch])
+        except Exception as error:
+            responses = [{"error": str(error)}] * len(batch)
+        finally:
+            self.__running.release()
+        for (_, result), response in zip(batch, responses):
+            if not result.done():
+                result.set_result(response)
+
+class SolverClient():
+    """
+    Sends puzzles to a SolverService, many puzzles can be waiting on one connection at once
+
+    Classmethods
+    ------------
+    connect(host: str = "127.0.0.1", port: int = 8765, path: str = None) -> SolverClient
+        connects to a service
+
+    Methods
+    -------
+    solve(self, puzzle: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> dict
+        solves a puzzle
+    solve_many(self, puzzles: list) -> list
+        solves many puzzles at once
+    close(self) -> None
+        closes the connection
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Parameters
+        ----------
+        reader: asyncio.StreamReader
+            the connection's reader
+        writer: asyncio.StreamWriter
+            the connection's writer
+        """
+        self.reader = reader
+        self.writer = writer
+        self.__ids = itertools.count()
+        # the future of every request still waiting by its id
+        self.__waiting = {}
+        self.__listener = asyncio.create_task(self.__listen())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765, path: str = None) -> SolverClient:
+        """
+        Connects to a service
+
+        Parameters
+        ----------
+        host: str, optional, default: "127.0.0.1"
+            the address of the service
+        port: int, optional, default: 8765
+            the port of the service
+        path: str, optional, default: None
+            if given, connect to this unix socket instead of host and port
+
+        Returns
+        -------
+        SolverClient
+            the connected client
+        """
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def __aenter__(self) -> SolverClient:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def solve(self, puzzle: str|list[list[int]]|np.ndarray((9,9), np.int8)) -> dict:
+        """
+        Solves a puzzle
+
+        Parameters
+        ----------
+        puzzle: str|list[list[int]]|np.ndarray((9,9), np.int8)
+            the puzzle
+
+        Returns
+        -------
+        dict
+            the response of the service, see the top of service.py
+        """
+        id = next(self.__ids)
+        result = self.__waiting[id] = asyncio.get_running_loop().create_future()
+        self.writer.write(_encode({"id": id, "puzzle": to_string(puzzle)}))
+        await self.writer.drain()
+        return await result
+
+    async def solve_many(self, puzzles: list) -> list:
+        """
+        Solves many puzzles at once, they are all sent before any response is waited for
+
+        Parameters
+        ----------
+        puzzles: list
+            the puzzles
+
+        Returns
+        -------
+        list
+            the responses in the same order as the puzzles
+        """
+        return await asyncio.gather(*(self.solve(puzzle) for puzzle in puzzles))
+
+    async def close(self) -> None:
+        """Closes the connection, the requests still waiting are cancelled"""
+        self.__listener.cancel()
+        for result in self.__waiting.values():
+            result.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def __listen(self) -> None:
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            result = self.__waiting.pop(response.get("id"), None)
+            if result is not None and not result.done():
+                result.set_result(response)
+        # the service went away
+        for result in self.__waiting.values():
+            result.set_exception(ConnectionError("the connection to the service was closed"))
+        self.__waiting.clear()
+
+def _encode(response: dict) -> bytes:
+    return (json.dumps(response) + "\n").encode()
+
+def _init_worker(max_nodes: int) -> None:
+    global _worker_solver, _worker_max_nodes
+    _worker_solver = Solver()
+    _worker_max_nodes = max_nodes
+
+def _solve_batch(puzzles: list) -> list:
+    # runs in a worker process, one count of up to two solutions gives the solution and whether it is unique
+    responses = []
+    for puzzle in puzzles:
+        start = perf_counter()
+        solutions = []
+        count = _worker_solver.count_solutions(from_string(puzzle), 2, _worker_max_nodes, solutions=solutions)
+        if isinstance(count, Pending) and not solutions:
+            responses.append({"error": "the search ran out of nodes", "solve_seconds": perf_counter() - start})
+            continue
+        # a count that ran out after the first solution cannot tell whether there is a second one
+        unique = None if isinstance(count, Pending) else count == 1
+        responses.append({"solution": to_string(solutions[0]) if solutions else None,
+            "unique": unique, "solve_seconds": perf_counter() - start})
+    return responses
+
+async def _main(args: argparse.Namespace) -> None:
+    service = SolverService(args.workers, args.batch_size, args.batch_delay, args.queue_size, args.max_nodes)
+    server = await service.start(args.host, args.port, args.path)
+    print("listening on", args.path or ":".join(map(str, server.sockets[0].getsockname()[:2])), flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solves sudoku puzzles sent as lines of JSON over a socket")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="the port to listen on")
+    parser.add_argument("--path", default=None, help="listen on this unix socket instead of host and port")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the number of processes")
+    parser.add_argument("--batch-size", type=int, default=64, help="the most puzzles sent to a process at once")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="the seconds to wait for more puzzles")
+    parser.add_argument("--queue-size", type=int, default=1024, help="the most puzzles waiting")
+    parser.add_argument("--max-nodes", type=int, default=None, help="the most values a search can try")
+    asyncio.run(_main(parser.parse_args()))
@@ -1,307 +1,1051 @@
 from __future__ import annotations
+import argparse
 import collections
+import contextlib
 import generator
+import itertools
+import multiprocessing
+import multiprocessing.pool
 import numpy as np
+import os
+from board import LAYOUT, Board, Layout
+from candidates import Candidates
+from search import Search
+from puzzle_io import from_string, read_puzzles, to_string, write_solutions
+from stats import Event, SearchStats
+from strategies import mrv
+from techniques import DIFFICULTY, TECHNIQUES
+from typing import Iterable, Iterator
+
+# the most values generate_unique lets a check try on the boards bigger than 9 by 9
+# emptying the last cells of those boards can take a search of hours, keeping those cells bounds the time
+CHECK_NODES = 50
+
 class Solver(generator.Generator):
     """
     This class solves ccreates a solver which can solve Sudoku problems
 
+    Attributes
+    ----------
+    stats: SearchStats
+        records what the search does, nothing is recorded if it is None
+    techniques: tuple
+        the deductions tried before the search, see techniques.py
+
     Staticmethods
     -------------
-    has_unique_solution(board: list[list[int]]|np.ndarray((9,9), np.int8)) -> bool
+    has_unique_solution(board: list[list[int]]|np.ndarray((size,size), np.int8), strategy = mrv) -> bool
         checks if a given board has unique solutions
-    validate(grid: np.ndarray((9,9), np.int8)) -> bool
-        validates the solution
+    validate(grid: np.ndarray((size,size), np.int8)|np.ndarray((N,size,size), np.int8)) -> bool|np.ndarray
+        validates a solution or a stack of solutions
+    count_units(cache: dict) -> list
+        counts the cells each value can go to in every unit
     
     Methods
     -------
-    solve(self, board: list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8)
+    solve(self, board: list[list[int]]|np.ndarray((size,size), np.int8), max_nodes: int = None, deadline: float = None) -> np.ndarray((size,size), np.int8)|Pending
         Solves the sudoku problem in-place
-    fill(self, grid: np.ndarray((9,9), np.int8) -> bool
+    resume(self, token: Pending, max_nodes: int = None, deadline: float = None) -> np.ndarray((size,size), np.int8)|int|Pending
+        carries on a solve or a count that ran out of budget
+    trace(self, board: list[list[int]]|np.ndarray((size,size), np.int8)) -> Iterator[Event]
+        solves a board one step at a time, yielding every value placed and taken back
+    solve_many(self, boards: list, workers: int = None, chunksize: int = 64, pool: multiprocessing.pool.Pool = None) -> list
+        solves many problems across a pool of processes
+    solve_stream(self, boards: Iterable, pool: multiprocessing.pool.Pool, chunksize: int = 64, ahead: int = None) -> Iterator
+        solves a stream of problems in a pool, a few chunks at a time
+    pool(self, workers: int = None) -> multiprocessing.pool.Pool
+        starts processes that each hold a solver set up like this one
+    config(self) -> tuple
+        gets what is needed to build a solver set up like this one
+    prepare(self, board: Board) -> tuple
+        fills in the values that can be deduced before the search
+    deduce(self, grid: np.ndarray((size,size), np.int8), cache: dict) -> collections.Counter
+        removes candidates with the techniques until none of them finds anything
+    rate(self, board: list[list[int]]|np.ndarray((size,size), np.int8)) -> tuple
+        rates how hard a board is by the techniques needed to solve it
+    count_solutions(self, board: list[list[int]]|np.ndarray((size,size), np.int8), limit: int = 2, max_nodes: int = None, deadline: float = None, solutions: list = None) -> int|Pending
+        counts the solutions of a board up to limit
+    count(self, grid: Board, cache: dict, masks: Candidates, limit: int) -> int
+        counts the ways the empty cells can be filled
+    search(self, grid: Board, cache: dict, masks: Candidates) -> Search
+        sets up a search of the empty cells
+    generate_unique(self, clues: int = None, max_nodes: int = None) -> tuple
+        generates a board that is guaranteed to have a unique solution
+    has_other_solution(self, grid: Board, masks: Candidates, cell: int, val: int, cache: dict = None, max_nodes: int = None) -> bool
+        checks if the board can be solved with a value other than val in cell
+    fill(self, grid: Board|np.ndarray((size,size), np.int8), cache: dict, masks: Candidates = None) -> bool
         fills in the empty cells
-    cache_values(self, grid: np.ndarray((9,9), np.int8)) -> dict
+    cache_values(self, grid: np.ndarray((size,size), np.int8), cache: dict, counts: list = None) -> tuple
         this returns adictionary of possible values in a certain location
-    allowed_values(self, grid: np.ndarray((9,9), np.int8), pos: tuple) -> list
+    allowed_values(self, grid: np.ndarray((size,size), np.int8), pos: tuple, masks: Candidates = None) -> list
         returns a list of possible/ valid values for a given location
-    get_candidates(self, grid: np.ndarray((9,9), np.int8)) -> dict
+    get_candidates(self, grid: np.ndarray((size,size), np.int8), masks: Candidates = None) -> dict
         gets the candidate of a particular cell
+    timer(self, phase: str) -> contextlib.AbstractContextManager
+        times a phase into the stats
+    propagate(self, grid: Board, masks: Candidates) -> bool
+        places every naked and hidden single until none is left
     """
 
-    def allowed_values(self, grid: np.ndarray((9,9), np.int8), pos: tuple) -> list:
+    def __init__(self, strategy = mrv, stats: SearchStats = None, techniques = TECHNIQUES.values(), box: int = 3):
+        """
+        Parameters
+        ----------
+        strategy: function, optional, default: mrv
+            chooses the next cell to branch on, see strategies.py
+        stats: SearchStats, optional, default: None
+            records the nodes, backtracks, depth, singles and time of every search
+        techniques: iterable, optional, default: every technique of techniques.py
+            the deductions tried before the search, in order, an empty tuple turns them all off
+        box: int, optional, default: 3
+            the number of rows of a box of the boards generated, the boards solved can be of any size
+        """
+        super().__init__(strategy, box)
+        self.stats = stats
+        self.techniques = tuple(techniques)
+
+    def timer(self, phase: str) -> contextlib.AbstractContextManager:
+        """
+        Times a phase into the stats, it does nothing when there are no stats
+
+        Parameters
+        ----------
+        phase: str
+            the name of the phase
+        """
+        return self.stats.timer(phase) if self.stats is not None else contextlib.nullcontext()
+
+    def allowed_values(self, grid: np.ndarray((size,size), np.int8), pos: tuple, masks: Candidates = None) -> list:
         """
         Gets the valid candidates for a particular cell
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being worked on
         pos: tuple
             the coordinates to work on
+        masks: Candidates, optional, default: None
+            the masks of the grid, they are built from the grid if not given
         
         Returns
         -------
         list
             a list of valid candidates
         """
-        available = []
-        for num in range(1, 10):
-            if self.is_valid(grid, num, pos):
-                available.append(num)
-        return available
+        if masks is None:
+            masks = Candidates(grid)
+        return masks.allowed(len(grid) * pos[0] + pos[1])
 
-    def get_candidates(self, grid: np.ndarray((9,9), np.int8)) -> dict:
+    def get_candidates(self, grid: np.ndarray((size,size), np.int8), masks: Candidates = None) -> dict:
         """
         Finds the candidates for all empty cells
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being worked on
+        masks: Candidates, optional, default: None
+            the masks of the grid, they are built from the grid if not given
         
         Returns
         -------
         dict
             a dictionary with coordinates as keys and valid candidates as values
         """
+        # the masks are built once so every cell is a lookup rather than a scan of the grid
+        if masks is None:
+            masks = Candidates(grid)
         cache = {}
-        for i, row in enumerate(grid):
+        for i, row in enumerate(grid.tolist()):
             for j, cell in enumerate(row):
                 if cell == 0:
-                    cache[(i, j)] = self.allowed_values(grid, (i,j))
+                    cache[(i, j)] = masks.allowed(len(grid) * i + j)
         return cache #cache is a tuple of positions with a list of candidates
 
-    def cache_values(self, grid: np.ndarray((9,9), np.int8), cache: dict) -> tuple:
+    def cache_values(self, grid: np.ndarray((size,size), np.int8), cache: dict, counts: list = None) -> tuple:
         """
         Orders the candidates according to frequency
-        If a cell has only one candidate, that candiate is inserted directly
+        If a cell has only one candidate or a value is a candidate of only one cell in a row, column or box,
+        it is inserted directly
+        The frequencies are kept as counts per unit and per value which are updated in place after every insertion,
+        only the units touched by an insertion are checked again
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
+        grid: np.ndarray((size,size), np.int8)
             the grid being evaluated
         cache: dict
-            a cache containing positions and candidates
+            a cache containing positions and candidates, the inserted cells are removed from it
+        counts: list, optional, default: None
+            the counts of the cache as returned by count_units, they are built from the cache if not given
 
         Returns
         -------
-        tuple (bool, dict)
-            an indicator for whether a new value was inserted directly into the grid, the cache updated by frequency
+        tuple (dict, bool)
+            the cache updated by frequency, an indicator for whether a new value was inserted directly into the grid
         """
-
+        layout = Layout.of(len(grid))
+        size, units, pos_of = layout.size, layout.units, layout.pos
+        if counts is None:
+            counts = self.count_units(cache, layout)
         valuesfound = False # stores if we found the correct value of a cell
-        # freq_cache stores the positions and frequenceis without the numbers/values
-        freq_cache = {}
-        colcount = [None for _ in range(9)] # stores the numbers in a particular column and the frequency
-        rowcount = [None for _ in range(9)] # stores the numbers in a particular row and the frequency
-        boxcount = [None for _ in range(9)] # stores the numbers in a particular subgrid and the frequency
-        
-        # loop through the the cells in each row and add the frequency for each number
-        for row in range(9):
-            templist = []
-            for col in range(9):
-                if (row, col) in cache:
-                    templist.extend(cache[(row,col)])
-            rowcount[row] = dict(collections.Counter(templist))
-
-        # loop through the the cells in each column and add the frequency for each number
-        for col in range(9):
-            templist = []
-            for row in range(9):
-                if (row, col) in cache:
-                    templist.extend(cache[(row,col)])
-            colcount[col] = dict(collections.Counter(templist))
-        
-        # loop through the the cells in each subgrid and add the frequency for each number
-        # the subgrids are numbered 0 to 8 (the top 3 subgrids, the middle and the last)
-        for box_num in range(9):
-            templist = []
-            box_start_row = 3 * (box_num//3)
-            box_start_col = 3 * (box_num % 3)
-            for row in range(box_start_row, box_start_row + 3):
-                for col in range(box_start_col, box_start_col + 3):
-                    if (row, col) in cache:
-                        templist.extend(cache[(row,col)])
-            boxcount[box_num] = dict(collections.Counter(templist))
-            
-        # for each cell, if there is a value that is a candidate for only one cell
-        # fill it in because if another value is placed in that cell, that value would have no place to be
-        for row in range(9):
-            for col in range(9):
-                templist = []
-                box_num = (row //3) * 3 + col//3
-                if (row, col) in cache:
-                    for val in cache[(row, col)]:
-                        # if the a cell's candidate has only that cell as an option, fill it up
-                        # note, each columns data occupies the corresponding index in the columns list
-                        # this is true for both the row and the box
-                        if colcount[col][val] == 1 or rowcount[row][val]== 1 or boxcount[box_num][val] == 1:
-                            grid[row,col] = val
-                            valuesfound = True
-                        else:
-                            templist.append(colcount[col][val] + rowcount[row][val] + boxcount[box_num][val])
-                    freq_cache[(row, col)] = templist
-        # since each key (the position) in the cache corresponds with the that of freq_cache
-        # we zip the values together meaning that we make a tuple of the numbers and the corresponding frequencies
-        # sort them in order of increasing frequencies
-        for k in cache:
-            cache[k] =[val for _, val in sorted(zip(freq_cache[k], cache[k]))]
+        # the cells with a single candidate are filled first
+        naked = [pos for pos, values in cache.items() if len(values) == 1]
+        # every unit is checked once, after that only the units whose counts changed
+        pending = set(range(3 * size))
+        while pending or naked:
+            if naked:
+                pos = naked.pop()
+                values = cache.get(pos)
+                if values is not None and len(values) == 1:
+                    grid[pos] = values[0]
+                    valuesfound = True
+                    pending.update(self.__uncache(cache, counts, size * pos[0] + pos[1], values[0], naked, layout))
+                continue
+            unit = pending.pop()
+            for val in range(1, size + 1):
+                # if a value has only one cell as an option in the unit, fill it up
+                # because if another value is placed in that cell, that value would have no place to be
+                if counts[unit][val] != 1:
+                    continue
+                for cell in units[unit]:
+                    if val in cache.get(pos_of[cell], ()):
+                        grid[pos_of[cell]] = val
+                        valuesfound = True
+                        pending.update(self.__uncache(cache, counts, cell, val, naked, layout))
+                        break
+        # sort the candidates in order of increasing frequencies in the units of the cell
+        for pos, values in cache.items():
+            unitcounts = [counts[unit] for unit in layout.cell_units[size * pos[0] + pos[1]]]
+            cache[pos] = sorted(values, key = lambda val: (sum(count[val] for count in unitcounts), val))
         return cache, valuesfound
 
-    def solve(self, board: list[list[int]]|np.ndarray((9,9), np.int8)) -> np.ndarray((9,9), np.int8):
+    @staticmethod
+    def count_units(cache: dict, layout: Layout = LAYOUT) -> list:
+        """
+        Counts the cells each value can go to in every unit
+
+        Parameters
+        ----------
+        cache: dict
+            a cache containing positions and candidates
+        layout: Layout, optional, default: LAYOUT
+            the tables of the board, the 9 by 9 board by default
+
+        Returns
+        -------
+        list
+            a list per unit of Layout.units, where [unit][val] is the number of cells in the unit with val as a candidate
+        """
+        counts = [[0] * (layout.size + 1) for _ in layout.units]
+        for pos, values in cache.items():
+            for unit in layout.cell_units[layout.size * pos[0] + pos[1]]:
+                count = counts[unit]
+                for val in values:
+                    count[val] += 1
+        return counts
+
+    @staticmethod
+    def __uncache(cache: dict, counts: list, cell: int, val: int, naked: list, layout: Layout) -> set:
+        # the cell is filled so none of its candidates count any more
+        cell_units, pos = layout.cell_units, layout.pos
+        units = set(cell_units[cell])
+        for other in cache.pop(pos[cell]):
+            for unit in cell_units[cell]:
+                counts[unit][other] -= 1
+        # and val is no longer a candidate of its peers
+        for peer in layout.peers[cell]:
+            values = cache.get(pos[peer])
+            if values is not None and val in values:
+                values.remove(val)
+                if len(values) == 1:
+                    naked.append(pos[peer])
+                for unit in cell_units[peer]:
+                    counts[unit][val] -= 1
+                    units.add(unit)
+        return units
+
+    def solve(self, board: list[list[int]]|np.ndarray((size,size), np.int8), max_nodes: int = None,
+            deadline: float = None) -> np.ndarray((size,size), np.int8)|Pending:
         """
         Solves the given problem.
         This checks that the given board is valid else an exception is raised
+        With a budget, a board that takes too long gives back a Pending token instead of holding on to the caller,
+        resume carries on from where the search stopped
 
         Parameters
         ----------
-        board: list[list[int]]|np.ndarray((9,9), np.int8
+        board: list[list[int]]|np.ndarray((size,size), np.int8
             the board to solve
+        max_nodes: int, optional, default: None
+            the most values the search can try, if None there is no limit
+        deadline: float, optional, default: None
+            the time.monotonic() time the search has to stop by, if None there is no limit
+
+        Returns
+        -------
+        np.ndarray((size,size), np.int8)|Pending
+            the solved board, None if there is no solution or a Pending token if the budget ran out
+        """
+        # the search works on a copy stored as bytes, the array returned is a view of the same memory
+        grid = Board.from_array(board)
+        self.nodes = 0
+        if self.stats is not None:
+            self.stats.reset()
+        with self.timer("prepare"):
+            cache, masks = self.prepare(grid)
+        if masks is None:
+            return None
+        return self.resume(Pending(self.search(grid, cache, masks)), max_nodes, deadline)
+
+    def resume(self, token: Pending, max_nodes: int = None, deadline: float = None) -> np.ndarray((size,size), np.int8)|int|Pending:
+        """
+        Carries on a solve or a count from where it stopped
+        The nodes are added to self.nodes and a new budget is given for this call
+
+        Parameters
+        ----------
+        token: Pending
+            the token given back by solve or count_solutions, it has to come from this solver
+        max_nodes: int, optional, default: None
+            the most values the search can try in this call, if None there is no limit
+        deadline: float, optional, default: None
+            the time.monotonic() time the search has to stop by, if None there is no limit
 
         Returns
         -------
-        np.ndarray((9,9), np.int8
-            the solved board
+        np.ndarray((size,size), np.int8)|int|Pending
+            what solve or count_solutions would have returned, or the token again if the budget ran out
+        """
+        search = token.search
+        if search.engine is not self:
+            raise ValueError("the token was made by another solver")
+        stop = None if max_nodes is None else self.nodes + max_nodes
+        with self.timer("search"):
+            if token.limit is None:
+                if search.next_solution(stop, deadline):
+                    return search.grid.array
+                return None if search.finished else token
+            while token.found < token.limit:
+                if search.next_solution(stop, deadline):
+                    token.found += 1
+                    if token.solutions is not None:
+                        token.solutions.append(search.grid.array.copy())
+                elif not search.finished:
+                    return token
+                else:
+                    break
+            search.abandon()
+            return token.found
+
+    def trace(self, board: list[list[int]]|np.ndarray((size,size), np.int8)) -> Iterator[Event]:
         """
-        grid = np.array(board)
+        Solves a board one step at a time, the search only goes on as the events are asked for
+        so a consumer can draw, record or stop the solve whenever it wants
+        Replaying the events on the board gives the solution: "place" and "propagate" put val in pos,
+        "remove" and "backtrack" empty pos again, the board itself is not changed
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((size,size), np.int8)
+            the board to solve
+
+        Yields
+        ------
+        Event
+            "propagate" for the values deduced, with the technique that found them,
+            "place" for a value tried while branching, "remove" for a deduced value taken back,
+            "backtrack" for a tried value taken back and "solved" once, with pos and val None, if there is a solution
+        """
+        grid = Board.from_array(board)
+        before = grid.array.copy()
+        events = []
+        # the values deduced after each value tried, they are taken back with it
+        deduced = [[]]
+
+        def record(kind: str, pos: tuple, val: int, depth: int) -> None:
+            if kind == "node":
+                deduced.append([])
+                events.append(Event("place", pos, val, depth, None))
+            elif kind == "backtrack":
+                for cell, value in reversed(deduced.pop()):
+                    events.append(Event("remove", cell, value, depth, None))
+                events.append(Event("backtrack", pos, val, depth, None))
+            else:
+                deduced[-1].append((pos, val))
+                events.append(Event("propagate", pos, val, depth, kind))
+
+        # a solver of its own so the events do not end up in the stats of this one
+        tracer = Solver(self.strategy, SearchStats(record), self.techniques)
+        tracer.layout = self.layout
+        cache, masks = tracer.prepare(grid)
+        # the values filled by cache_values and the techniques are not reported one by one so they are found by comparing
+        singles = {event.pos for event in events}
+        for row, col in zip(*np.nonzero(grid.array != before)):
+            if (row, col) not in singles:
+                yield Event("propagate", (int(row), int(col)), int(grid.array[row, col]), 0, "cache")
+        yield from events
+        events.clear()
+        if masks is None:
+            return
+        search = tracer.search(grid, cache, masks)
+        while True:
+            # one value is tried at a time so nothing is worked out before it is asked for
+            found = search.next_solution(tracer.nodes + 1)
+            yield from events
+            events.clear()
+            if found:
+                yield Event("solved", None, None, tracer.stats.depth, None)
+                return
+            if search.finished:
+                return
+
+    def prepare(self, board: Board) -> tuple:
+        """
+        Checks the grid and fills in every value that can be deduced before the search
+        This is shared by solve and count_solutions
+
+        Parameters
+        ----------
+        board: Board
+            the grid to prepare, it is changed in place
+
+        Returns
+        -------
+        tuple (dict, Candidates)
+            the candidates of each empty cell ordered by frequency and the masks of the grid
+            the masks are None if the grid has no solution
+        """
+        grid = board.array
         # check
-        try:
-            assert grid.shape == (9,9) # grid is a 9 by 9 board
-            assert (grid < 10).all() and (grid > -1).all() # all numbers in grid are valid numbers
-        except AssertionError:
-            print("Invalid boaard!!")
-        # print("Solving")
-        # while we find the correct value for a cell, keep caching the values
-        # and updating the grid
-        found_new_val = True
-        while found_new_val:
-            candidates = self.get_candidates(grid)
-            cache, found_new_val = self.cache_values(grid, candidates)
-        if self.fill(grid, cache):
-            return grid
-        return None
-
-    def fill(self, grid: np.ndarray((9,9), np.int8), cache: dict) -> bool:
+        # all numbers in grid have to be valid numbers, carrying on with the others would search forever or crash
+        if not ((grid <= board.layout.size).all() and (grid > -1).all()):
+            raise ValueError(f"the values of a board have to be from 0 to {board.layout.size}")
+        # givens that clash have no solution, without this the search would try every branch to find that out
+        if Candidates(board).clash:
+            return None, None
+        # cache_values keeps inserting values until none can be found
+        empty = int((grid == 0).sum())
+        cache, _ = self.cache_values(grid, self.get_candidates(grid))
+        if self.techniques:
+            used = self.deduce(grid, cache)
+            if self.stats is not None:
+                self.stats.techniques.update(used)
+        masks = Candidates(board)
+        if self.stats is not None:
+            self.stats.singles["cache"] += empty - len(masks.empty)
+        if not self.propagate(board, masks):
+            return cache, None
+        return cache, masks
+
+    def deduce(self, grid: np.ndarray((size,size), np.int8), cache: dict) -> collections.Counter:
+        """
+        Removes candidates from the cache with the techniques of the solver until none of them finds anything
+        After every removal the singles are filled in and the techniques start again from the first (simplest) one
+
+        Parameters
+        ----------
+        grid: np.ndarray((size,size), np.int8)
+            the grid being worked on, the singles found are inserted into it
+        cache: dict
+            a cache containing positions and candidates as returned by cache_values, it is updated in place
+
+        Returns
+        -------
+        collections.Counter
+            the number of candidates removed by each technique
+        """
+        layout = Layout.of(len(grid))
+        size = layout.size
+        used = collections.Counter()
+        while cache:
+            cells = [0] * layout.area
+            for pos, values in cache.items():
+                cells[size * pos[0] + pos[1]] = sum(1 << (val - 1) for val in values)
+            for technique in self.techniques:
+                removed = technique(cells, layout)
+                if removed:
+                    used[technique.__name__] += removed
+                    break
+            else:
+                break
+            for pos, values in cache.items():
+                mask = cells[size * pos[0] + pos[1]]
+                cache[pos] = [val for val in values if mask & (1 << (val - 1))]
+            self.cache_values(grid, cache)
+        return used
+
+    def rate(self, board: list[list[int]]|np.ndarray((size,size), np.int8)) -> tuple:
+        """
+        Rates how hard a board is for a person by the techniques needed to solve it
+        The board is not changed
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((size,size), np.int8)
+            the board to rate
+
+        Returns
+        -------
+        tuple (int, collections.Counter)
+            the difficulty of the hardest technique needed (see techniques.DIFFICULTY), 0 for a full board
+            and the number of candidates removed by each technique
+        """
+        grid = np.array(board, dtype=np.int8)
+        empty = bool((grid == 0).any())
+        cache, _ = self.cache_values(grid, self.get_candidates(grid))
+        used = self.deduce(grid, cache) if self.techniques else collections.Counter()
+        if cache:
+            return DIFFICULTY["search"], used
+        return max([DIFFICULTY[name] for name in used] + [DIFFICULTY["singles"] if empty else 0]), used
+
+    def solve_many(self, boards: list, workers: int = None, chunksize: int = 64,
+            pool: multiprocessing.pool.Pool = None) -> list:
+        """
+        Solves many problems, sharding them across a pool of processes
+        The boards are sent to the workers as 81 character strings to keep the communication cheap
+        and every worker keeps one solver, set up like this one, for all the boards it gets
+        With stats, they hold the totals of every board once this returns, the callback is not called from the workers
+
+        Parameters
+        ----------
+        boards: list
+            the boards to solve, each a list[list[int]], a np.ndarray((9,9), np.int8) or an 81 character string
+        workers: int, optional, default: None
+            the number of processes, it defaults to the number of cores
+            if it is 1, the boards are solved in this process
+        chunksize: int, optional, default: 64
+            the number of boards sent to a worker at once
+        pool: multiprocessing.pool.Pool, optional, default: None
+            a pool from self.pool to reuse, the workers are kept between calls, if None a pool is started for this call
+
+        Returns
+        -------
+        list
+            the solutions in the same order as the boards, None for the boards that could not be solved
+        """
+        if pool is None and workers == 1:
+            if self.stats is not None:
+                self.stats.reset()
+            _init_worker(self.config())
+            lines = [to_string(board) for board in boards]
+            chunks = (lines[start:start + chunksize] for start in range(0, len(lines), chunksize))
+            return list(self.__collect(map(_solve_chunk, chunks)))
+        if pool is None:
+            with self.pool(workers) as pool:
+                return self.solve_many(boards, workers, chunksize, pool)
+        return list(self.solve_stream(boards, pool, chunksize))
+
+    def solve_stream(self, boards: Iterable, pool: multiprocessing.pool.Pool, chunksize: int = 64, ahead: int = None) -> Iterator:
+        """
+        Solves a stream of problems in a pool, the boards are only read as the workers get through them
+        so the memory used does not grow with the stream, and a slow chunk only holds up the chunks after it
+
+        Parameters
+        ----------
+        boards: Iterable
+            the boards to solve, as for solve_many
+        pool: multiprocessing.pool.Pool
+            the pool from self.pool
+        chunksize: int, optional, default: 64
+            the number of boards sent to a worker at once
+        ahead: int, optional, default: None
+            the most chunks handed to the pool and not collected yet, it defaults to 4 per core
+
+        Yields
+        ------
+        np.ndarray((size,size), np.int8)
+            the solutions in the same order as the boards, None for the boards that could not be solved
+        """
+        if ahead is None:
+            ahead = 4 * (os.cpu_count() or 1)
+        if self.stats is not None:
+            self.stats.reset()
+        lines = (to_string(board) for board in boards)
+        chunks = iter(lambda: list(itertools.islice(lines, chunksize)), [])
+        waiting = collections.deque()
+        for chunk in chunks:
+            waiting.append(pool.apply_async(_solve_chunk, (chunk,)))
+            # the oldest chunk is waited for before more are handed over
+            if len(waiting) >= ahead:
+                yield from self.__collect([waiting.popleft().get()])
+        while waiting:
+            yield from self.__collect([waiting.popleft().get()])
+
+    def __collect(self, results: Iterable) -> Iterator:
+        # turns what _solve_chunk gives back into solutions and adds up the stats
+        for solved, stats in results:
+            if stats is not None:
+                self.stats.merge(stats)
+            for result in solved:
+                yield from_string(result) if result else None
+
+    def pool(self, workers: int = None) -> multiprocessing.pool.Pool:
+        """
+        Starts processes that each hold a solver with the strategy, techniques and box size of this one
+        Use it as `with solver.pool() as pool:` and give it to solve_many to keep the workers between calls
+
+        Parameters
+        ----------
+        workers: int, optional, default: None
+            the number of processes, it defaults to the number of cores
+
+        Returns
+        -------
+        multiprocessing.pool.Pool
+            the pool of processes
+        """
+        return multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self.config(),))
+
+    def config(self) -> tuple:
+        """
+        Gets what is needed to build a solver set up like this one in another process
+
+        Returns
+        -------
+        tuple (function, tuple, int, bool)
+            the strategy, the techniques, the box size and whether or not there are stats
+        """
+        return self.strategy, self.techniques, self.layout.box_size, self.stats is not None
+
+    def fill(self, grid: Board|np.ndarray((size,size), np.int8), cache: dict, masks: Candidates = None) -> bool:
         """
         Fills the board with values until a solutiion is found
 
         Parameters
         ----------
-        grid: np.ndarray((9,9), np.int8)
-            the grid being solved
+        grid: Board|np.ndarray((size,size), np.int8)
+            the grid being solved, an array is copied into a Board and the solution copied back
         cache: dict
             stores the valid candidates for each empty cell
+        masks: Candidates, optional, default: None
+            the masks of the grid, they are kept in sync with every insertion
 
         Returns
         -------
         bool
             whether or not the board could be solved/filled
         """
-        pos = self.next_empty_cell(grid)
-        if not pos:
-            return True
-        x, y = pos
+        board = grid if isinstance(grid, Board) else Board.from_array(grid)
+        if masks is None:
+            masks = Candidates(board)
         # rather than checking all values from 1..9, we are checking only the valid ones
-        for i in cache[pos]:
-            if self.is_valid(grid, i, pos):
-                grid[x, y] = i
-                if self.fill(grid, cache):
-                    return True
-                grid[x, y] = 0
-        return False
+        # the singles found after an insertion are undone with it if the branch fails
+        pos = board.layout.pos
+        if not Search(self, board, masks, lambda cell: cache[pos[cell]], self.propagate).next_solution():
+            return False
+        if board is not grid:
+            grid[:] = board.array
+        return True
 
-    @staticmethod
-    def validate(grid: np.ndarray((9,9), np.int8)) -> bool:
+    def propagate(self, grid: Board, masks: Candidates) -> bool:
         """
-        Validates all values in their current position
-        It checks that every value in its corresponding position follows the rules of sudoku
+        Places naked singles (cells with one candidate) and hidden singles
+        (values with only one possible cell in a unit) until none is left
+        Every placement is recorded on the trail so it can be undone on backtrack
 
         Parameters
         ----------
-        grid: Generator
-            the grid to validate
+        grid: Board
+            the grid being solved
+        masks: Candidates
+            the masks of the grid
 
         Returns
         -------
-        bool:
-            indicates if all values are valid
-        """
-        ## all the columns, boxes, and rows have to have 1 to 9
-        # this means that the sum of all the values there should be 45
-        box_sum = 0
-        for i in range(9):
-            # sum of the row and columns respectively
-            if sum(grid[i])  != 45 or sum(grid[:, i]) != 45:
-                return False
-        
-        # sum of the boxes/ subgrids
-        # there are 9 3*3 grids, 3 each row and three on each colunn
-        # the entire sudoku also be seen as a large subgrid
-        for x in range(9):
-            box_start_row = 3 * (x//3)
-            box_start_column = 3 * (x % 3)
-            for i in range(box_start_row, box_start_row + 3):
-                for j in range(box_start_column, box_start_column + 3):
-                    box_sum += grid[i, j]
-            if box_sum != 45:
+        bool
+            False if a contradiction was found ie the current branch cannot be solved
+        """
+        stats = self.stats
+        layout = grid.layout
+        ROW, COL, BOX, POS = layout.row, layout.col, layout.box, layout.pos
+        PEERS, UNITS, CELL_UNITS = layout.peers, layout.units, layout.cell_units
+        ALL_VALUES, MASK_SIZES, MASK_VALUES = layout.all_values, layout.mask_sizes, layout.mask_values
+        rows, cols, boxes, size = masks.rows, masks.cols, masks.boxes, layout.size
+        used = (rows, cols, boxes)
+        # the candidates of every empty cell are worked out once and only the peers of a placed value
+        # are updated after that, a filled cell has no candidates so it adds nothing to the hidden singles
+        candidates = [0] * layout.area
+        for cell in masks.empty:
+            candidates[cell] = ALL_VALUES & ~(rows[ROW[cell]] | cols[COL[cell]] | boxes[BOX[cell]])
+            if not candidates[cell]:
                 return False
-            box_sum = 0
+        # the cells left with one candidate and the units whose candidates changed since they were checked
+        naked = [cell for cell in masks.empty if MASK_SIZES[candidates[cell]] == 1]
+        dirty = set(range(len(UNITS)))
+
+        def place(cell: int, val: int) -> bool:
+            # False if a peer is left without candidates
+            self.assign(grid, masks, cell, val)
+            candidates[cell] = 0
+            dirty.update(CELL_UNITS[cell])
+            bit = 1 << (val - 1)
+            for peer in PEERS[cell]:
+                if candidates[peer] & bit:
+                    allowed = candidates[peer] = candidates[peer] & ~bit
+                    if not allowed:
+                        return False
+                    if MASK_SIZES[allowed] == 1:
+                        naked.append(peer)
+                    dirty.update(CELL_UNITS[peer])
+            return True
+
+        while naked or dirty:
+            if stats is not None:
+                stats.propagations += 1
+            # naked singles, a cell filled since it was found has no candidates left
+            while naked:
+                cell = naked.pop()
+                allowed = candidates[cell]
+                if allowed:
+                    if stats is not None:
+                        stats.single("naked", POS[cell], MASK_VALUES[allowed][0])
+                    if not place(cell, MASK_VALUES[allowed][0]):
+                        return False
+            # hidden singles
+            # once holds the values seen in at least one empty cell and twice in at least two
+            units, dirty = dirty, set()
+            for unit in units:
+                cells = UNITS[unit]
+                once = twice = 0
+                for cell in cells:
+                    allowed = candidates[cell]
+                    twice |= once & allowed
+                    once |= allowed
+                # a value that is neither used nor possible in the unit has no place to go
+                if once | used[unit // size][unit % size] != ALL_VALUES:
+                    return False
+                hidden = once & ~twice
+                if not hidden:
+                    continue
+                for cell in cells:
+                    allowed = candidates[cell]
+                    if allowed & hidden:
+                        values = MASK_VALUES[allowed & hidden]
+                        # two values which can only go in the same cell
+                        if len(values) > 1:
+                            return False
+                        if stats is not None:
+                            stats.single("hidden", POS[cell], values[0])
+                        if not place(cell, values[0]):
+                            return False
         return True
 
     @staticmethod
-    def has_unique_solution(board: list[list[int]]|np.ndarray((9,9), np.int8)) -> bool:
+    def validate(grid: np.ndarray((size,size), np.int8)|np.ndarray((N,size,size), np.int8)) -> bool|np.ndarray:
+        """
+        Validates all values in their current position
+        It checks that every row, column and box holds each value from 1 to size exactly once
+        A stack of grids is validated in one call, which makes checking a batch of solutions almost free
+
+        Parameters
+        ----------
+        grid: np.ndarray((size,size), np.int8)|np.ndarray((N,size,size), np.int8)
+            the grid to validate or a stack of grids of the same size
+
+        Returns
+        -------
+        bool|np.ndarray(N, bool):
+            indicates if all values are valid, for a stack there is one result per grid
+        """
+        grids = np.asarray(grid)
+        single = grids.ndim == 2
+        if single:
+            grids = grids[None]
+        count, size = len(grids), grids.shape[-1]
+        box = Layout.of(size).box_size
+        ## every value becomes one bit, the bits of a unit are or-ed together
+        # a unit of size cells has every value exactly once only if all size bits end up set
+        # this is a real set check unlike the sums, a row of nine 5s adds up to 45 too
+        grids = grids.astype(np.int64)
+        inside = ((grids >= 1) & (grids <= size)).all(axis=(1, 2))
+        bits = np.left_shift(1, np.clip(grids, 1, size) - 1)
+        # (N, box row, row in box, box column, column in box) -> (N, box, cell in box)
+        boxes = bits.reshape((count, box, box, box, box)).swapaxes(2, 3).reshape((count, size, size))
+        full = (1 << size) - 1
+        valid = inside & (np.bitwise_or.reduce(bits, axis=2) == full).all(axis=1)\
+            & (np.bitwise_or.reduce(bits, axis=1) == full).all(axis=1)\
+            & (np.bitwise_or.reduce(boxes, axis=2) == full).all(axis=1)
+        return bool(valid[0]) if single else valid
+
+    @staticmethod
+    def has_unique_solution(board: list[list[int]]|np.ndarray((size,size), np.int8), strategy = mrv) -> bool:
         """
         Checks if a board has a unique solution
+        The board is not changed
 
         Rarameters
         ----------
-        board: list[list[int]]|np.ndarray((9,9), np.int8)
+        board: list[list[int]]|np.ndarray((size,size), np.int8)
             the board to check
+        strategy: function, optional, default: mrv
+            chooses the next cell to branch on, see strategies.py
         
         Returns
         -------
         bool
-            indicates if a board has a unique solution
-        """
-        board = np.array(board)
-        try:
-            assert board.shape == (9,9) # grid is a 9 by 9 board
-            assert (board < 10).all() and (board > -1).all() # all numbers in grid are valid numbers
-        except AssertionError:
-            print("Invalid boaard!!")
-        solver = Solver()
-        found_new_val = True
-        while found_new_val:
-            candidates = solver.get_candidates(board)
-            cache, found_new_val = solver.cache_values(board, candidates)
-        counter = 0
-        def unique(grid, cache):
-            nonlocal counter
-            pos = solver.next_empty_cell(grid)
-            # no need to move further if the counter detects another colution
-            if counter > 1:
-                return False
-            if not pos:
-                counter += 1
-                return False # do not stop when we have found a solution
-            x, y = pos
-            for i in cache[pos]:
-                if solver.is_valid(grid, i, pos):
-                    grid[x, y] = i
-                    if unique(grid, cache)and counter < 2:
-                        return True
-                    grid[x, y] = 0
-            return False
-        unique(board, cache)
-        if counter < 2:
-            return True
+            indicates if a board has exactly one solution
+        """
+        # no need to move further once a second solution is found
+        return Solver(strategy).count_solutions(board, 2) == 1
+
+    def count_solutions(self, board: list[list[int]]|np.ndarray((size,size), np.int8), limit: int = 2,
+            max_nodes: int = None, deadline: float = None, solutions: list = None) -> int|Pending:
+        """
+        Counts the solutions of a board, stopping as soon as limit solutions are found
+        The search works on a copy so the board is not changed
+        The number of search nodes visited is stored in self.nodes
+
+        Parameters
+        ----------
+        board: list[list[int]]|np.ndarray((size,size), np.int8)
+            the board to check
+        limit: int, optional, default: 2
+            the most solutions to count
+        max_nodes: int, optional, default: None
+            the most values the search can try, if None there is no limit
+        deadline: float, optional, default: None
+            the time.monotonic() time the search has to stop by, if None there is no limit
+        solutions: list, optional, default: None
+            if given, a copy of every solution counted is appended to it, also when the budget runs out
+
+        Returns
+        -------
+        int|Pending
+            the number of solutions, at most limit, or a Pending token if the budget ran out
+            the token keeps the solutions counted so far in found
+        """
+        grid = Board.from_array(board)
+        self.nodes = 0
+        if self.stats is not None:
+            self.stats.reset()
+        with self.timer("prepare"):
+            cache, masks = self.prepare(grid)
+        if masks is None:
+            return 0
+        return self.resume(Pending(self.search(grid, cache, masks), limit, solutions), max_nodes, deadline)
+
+    def count(self, grid: Board, cache: dict, masks: Candidates, limit: int) -> int:
+        """
+        Counts the ways the board can be filled, the grid is restored before returning
+
+        Parameters
+        ----------
+        grid: Board
+            the grid being solved
+        cache: dict
+            stores the valid candidates for each empty cell, if None every value is tried in order
+        masks: Candidates
+            the masks of the grid
+        limit: int
+            the search stops once this many solutions are found
+
+        Returns
+        -------
+        int
+            the number of solutions found, at most limit
+        """
+        search = self.search(grid, cache, masks)
+        found = 0
+        while found < limit and search.next_solution():
+            found += 1
+        search.abandon()
+        return found
+
+    def search(self, grid: Board, cache: dict, masks: Candidates) -> Search:
+        """
+        Sets up a search of the empty cells
+
+        Parameters
+        ----------
+        grid: Board
+            the grid being solved
+        cache: dict
+            stores the valid candidates for each empty cell, if None every value is tried in order
+        masks: Candidates
+            the masks of the grid
+
+        Returns
+        -------
+        Search
+            the search, nothing is tried until it is asked for a solution
+        """
+        if cache is None:
+            # the search only tries the values allowed by the masks so this orders nothing
+            every = list(range(1, grid.layout.size + 1))
+            values = lambda cell: every
+        else:
+            pos = grid.layout.pos
+            values = lambda cell: cache[pos[cell]]
+        return Search(self, grid, masks, values, self.propagate)
+
+    def generate_unique(self, clues: int = None, max_nodes: int = None) -> tuple:
+        """
+        Generates a board with a unique solution
+        Starting from a full grid, the cells are removed one at a time in a random order
+        and a removal is only kept if the board still has one solution
+        Every cell is visited once so the time taken is bounded
+
+        Parameters
+        ----------
+        clues: int, optional, default: None
+            stop once the board has this many values, if None as many cells as possible are removed
+        max_nodes: int, optional, default: None
+            the most values a check can try before the cell is kept, the board is still unique but may not be minimal
+            if None, the 9 by 9 checks have no limit and the bigger ones get CHECK_NODES
+
+        Returns
+        -------
+        tuple (np.ndarray((size,size), np.int8), np.ndarray((size,size), np.int8))
+            the problem and its solution
+        """
+        layout = self.layout
+        solution = np.zeros((layout.size, layout.size), dtype=np.int8)
+        # the singles keep the bigger boards out of dead ends, on a 9 by 9 board they cost more than they save
+        self.populate(solution, propagate=self.propagate if layout.size > 9 else None)
+        grid = Board.from_array(solution)
+        masks = Candidates(grid)
+        # another solution usually differs from this one in only a few cells
+        # so the search for it tries the value of the known solution first in every cell
+        every = range(1, layout.size + 1)
+        preferred = {layout.pos[cell]: [val] + [other for other in every if other != val]
+            for cell, val in enumerate(grid.cells)}
+        if max_nodes is None and layout.size > 9:
+            max_nodes = CHECK_NODES
+        filled = layout.area
+        for cell in np.random.permutation(layout.area).tolist():
+            if clues is not None and filled <= clues:
+                break
+            val = grid.cells[cell]
+            grid.cells[cell] = 0
+            masks.unplace(cell, val)
+            if self.has_other_solution(grid, masks, cell, val, preferred, max_nodes):
+                grid.cells[cell] = val
+                masks.place(cell, val)
+            else:
+                filled -= 1
+        return grid.array, solution
+
+    def has_other_solution(self, grid: Board, masks: Candidates, cell: int, val: int, cache: dict = None,
+            max_nodes: int = None) -> bool:
+        """
+        Checks if a board with a known solution has another one
+        If the board was unique before val was removed from cell, any other solution must have
+        a different value in cell, so only those branches are searched from the current masks
+
+        Parameters
+        ----------
+        grid: Board
+            the board, it is restored before returning
+        masks: Candidates
+            the masks of the board
+        cell: int
+            the cell that was just emptied
+        val: int
+            the value that was removed
+        cache: dict, optional, default: None
+            the order to try the values of each cell in, every value is tried in order if None
+        max_nodes: int, optional, default: None
+            the most values each branch can try, a branch that runs out is taken to have another solution
+
+        Returns
+        -------
+        bool
+            whether or not another solution exists, or might exist if the budget ran out
+        """
+        for other in masks.allowed(cell):
+            if other == val:
+                continue
+            mark = len(masks.trail)
+            self.assign(grid, masks, cell, other)
+            found = False
+            if self.propagate(grid, masks):
+                search = self.search(grid, cache, masks)
+                # a search that runs out of nodes counts as another solution, the value is kept to be safe
+                found = search.next_solution(None if max_nodes is None else self.nodes + max_nodes) or not search.finished
+                search.abandon()
+            self.undo(grid, masks, mark)
+            if found:
+                return True
         return False
 
+# the solver of a worker process, it is created once per process by _init_worker
+_worker_solver = None
+
+class Pending():
+    """
+    A solve or a count that ran out of budget, Solver.resume carries it on from where it stopped
+    It holds the search with its stack and the grid as they were so nothing is redone
+
+    Attributes
+    ----------
+    search: Search
+        the search that was stopped
+    limit: int
+        the most solutions to count, None for a solve
+    found: int
+        the number of solutions counted so far
+    solutions: list
+        where a count puts a copy of every solution it finds, None to keep none
+    """
+    __slots__ = ("search", "limit", "found", "solutions")
+
+    def __init__(self, search: Search, limit: int = None, solutions: list = None):
+        """
+        Parameters
+        ----------
+        search: Search
+            the search that was stopped
+        limit: int, optional, default: None
+            the most solutions to count, None for a solve
+        solutions: list, optional, default: None
+            where a count puts a copy of every solution it finds, None to keep none
+        """
+        self.search = search
+        self.limit = limit
+        self.found = 0
+        self.solutions = solutions
+
+def _init_worker(config: tuple) -> None:
+    global _worker_solver
+    strategy, techniques, box, stats = config
+    _worker_solver = Solver(strategy, SearchStats() if stats else None, techniques, box)
+
+def _solve_chunk(lines: list) -> tuple:
+    # the stats of every board are added up since a solve starts them again
+    solved = []
+    total = SearchStats() if _worker_solver.stats is not None else None
+    for line in lines:
+        solution = _worker_solver.solve(from_string(line))
+        solved.append(to_string(solution) if solution is not None else "")
+        if total is not None:
+            total.merge(_worker_solver.stats)
+    return solved, total
+
 
 if __name__ == "__main__":
-    game = generator.Generator().generate()
-    Solver.print_board(game)
-    solver = Solver()
-    res = solver.solve(game)
-    Solver.print_board(res)
-    print(Solver.has_unique_solution(game))
-    print(Solver.validate(res))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Solves the sudoku problems in a file of 81 character lines")
+    parser.add_argument("file", nargs="?", help="the problems, one per line with 0 or . for empty cells, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="where to write the solutions, - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="the number of processes")
+    parser.add_argument("-c", "--chunksize", type=int, default=64, help="the number of problems sent to a process at once")
+    args = parser.parse_args()
+    if args.file:
+        problems = read_puzzles(args.file)
+        solver = Solver()
+        if args.workers == 1:
+            write_solutions(map(solver.solve, problems), args.output)
+        else:
+            # one pool for the whole file, only a few chunks per worker are read ahead so the memory stays flat
+            with solver.pool(args.workers) as pool:
+                ahead = 4 * (args.workers or os.cpu_count() or 1)
+                write_solutions(solver.solve_stream(problems, pool, args.chunksize, ahead), args.output)
+    else:
+        game = generator.Generator().generate()
+        Solver.print_board(game)
+        solver = Solver()
+        res = solver.solve(game)
+        Solver.print_board(res)
+        print(Solver.has_unique_solution(game))
+        print(Solver.validate(res))
\ No newline at end of file
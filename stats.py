@@ -0,0 +1,177 @@
+from __future__ import annotations
+import collections
+from time import perf_counter
+
+# one step of Solver.trace, kind is "place", "propagate", "remove", "backtrack" or "solved"
+# technique is what placed the value of a "propagate", eg "naked", "hidden" or "cache", and None otherwise
+Event = collections.namedtuple("Event", "kind pos val depth technique")
+
+class SearchStats():
+    """
+    Counts what the solver does during a search
+    A Solver only records into it when it is given one, otherwise each hook costs a single `is None` check
+
+    Attributes
+    ----------
+    nodes: int
+        the number of values tried while branching
+    backtracks: int
+        the number of tried values that were taken back
+    depth: int
+        the current number of branches on the stack
+    max_depth: int
+        the deepest the search went
+    propagations: int
+        the number of rounds of naked and hidden singles
+    singles: collections.Counter
+        the number of values placed by each technique, "cache" is the deduction before the search
+    techniques: collections.Counter
+        the number of candidates removed by each of the techniques of techniques.py
+    times: collections.Counter
+        the seconds spent in each phase, "prepare" and "search"
+    callback: function
+        if set, it is called as callback(event, pos, val, depth) for every "node", "backtrack" and single
+
+    Methods
+    -------
+    reset(self) -> None
+        clears the counters
+    node(self, pos: tuple, val: int) -> None
+        records a value tried while branching
+    backtrack(self, pos: tuple, val: int) -> None
+        records a tried value being taken back
+    single(self, technique: str, pos: tuple, val: int) -> None
+        records a value placed by a deduction technique
+    merge(self, other: SearchStats) -> None
+        adds the counters of another SearchStats
+    timer(self, phase: str) -> _Timer
+        times a with block
+    as_dict(self) -> dict
+        returns the counters as a dictionary
+    """
+
+    def __init__(self, callback = None):
+        """
+        Parameters
+        ----------
+        callback: function, optional, default: None
+            called as callback(event, pos, val, depth) for every event
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the counters, this is done by the solver at the start of every solve"""
+        self.nodes = 0
+        self.backtracks = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.propagations = 0
+        self.singles = collections.Counter()
+        self.techniques = collections.Counter()
+        self.times = collections.Counter()
+
+    def node(self, pos: tuple, val: int) -> None:
+        """
+        Records a value tried while branching
+
+        Parameters
+        ----------
+        pos: tuple
+            the cell branched on
+        val: int
+            the value tried
+        """
+        self.nodes += 1
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+        if self.callback is not None:
+            self.callback("node", pos, val, self.depth)
+
+    def backtrack(self, pos: tuple, val: int) -> None:
+        """
+        Records a tried value being taken back
+
+        Parameters
+        ----------
+        pos: tuple
+            the cell branched on
+        val: int
+            the value taken back
+        """
+        self.backtracks += 1
+        if self.callback is not None:
+            self.callback("backtrack", pos, val, self.depth)
+        self.depth -= 1
+
+    def single(self, technique: str, pos: tuple, val: int) -> None:
+        """
+        Records a value placed by a deduction technique
+
+        Parameters
+        ----------
+        technique: str
+            the name of the technique, eg "naked" or "hidden"
+        pos: tuple
+            the cell filled
+        val: int
+            the value placed
+        """
+        self.singles[technique] += 1
+        if self.callback is not None:
+            self.callback(technique, pos, val, self.depth)
+
+    def merge(self, other: SearchStats) -> None:
+        """
+        Adds the counters of another SearchStats, eg the ones recorded in a worker process
+
+        Parameters
+        ----------
+        other: SearchStats
+            the counters to add, the deepest of the two searches is kept as max_depth
+        """
+        self.nodes += other.nodes
+        self.backtracks += other.backtracks
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.propagations += other.propagations
+        self.singles.update(other.singles)
+        self.techniques.update(other.techniques)
+        self.times.update(other.times)
+
+    def timer(self, phase: str) -> _Timer:
+        """
+        Times a phase, use it as `with stats.timer("search"):`
+
+        Parameters
+        ----------
+        phase: str
+            the name of the phase, the time is added to times[phase]
+        """
+        return _Timer(self.times, phase)
+
+    def as_dict(self) -> dict:
+        """
+        Gets the counters
+
+        Returns
+        -------
+        dict
+            the counters, ready to be saved as JSON
+        """
+        return {"nodes": self.nodes, "backtracks": self.backtracks, "max_depth": self.max_depth,
+            "propagations": self.propagations, "singles": dict(self.singles),
+            "techniques": dict(self.techniques), "times": dict(self.times)}
+
+class _Timer():
+    """Adds the time spent in a with block to a counter"""
+    def __init__(self, times: collections.Counter, phase: str):
+        self.times = times
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.times[self.phase] += perf_counter() - self.start
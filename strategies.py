@@ -0,0 +1,96 @@
+from __future__ import annotations
+from board import Board
+from candidates import Candidates
+
+# These functions choose the next cell to branch on during the search
+# they all take the grid and its masks and return the chosen cell or None if the grid is full
+# the tables of the board come from the masks so every board size is handled the same way
+
+def first_empty(grid: Board, masks: Candidates) -> int:
+    """
+    Chooses the first empty cell, moving column by column
+    This is the order used by Generator.next_empty_cell
+
+    Parameters
+    ----------
+    grid: Board
+        the grid being worked on
+    masks: Candidates
+        the masks of the grid
+
+    Returns
+    -------
+    int
+        the chosen cell
+    """
+    if not masks.empty:
+        return None
+    row, col = masks.layout.row, masks.layout.col
+    return min(masks.empty, key=lambda cell: (col[cell], row[cell]))
+
+def mrv(grid: Board, masks: Candidates) -> int:
+    """
+    Chooses the empty cell with the minimum remaining values (the fewest candidates)
+    A cell with no candidates is returned straight away because the branch is already dead
+
+    Parameters
+    ----------
+    grid: Board
+        the grid being worked on
+    masks: Candidates
+        the masks of the grid
+
+    Returns
+    -------
+    int
+        the chosen cell
+    """
+    layout = masks.layout
+    ROW, COL, BOX, ALL_VALUES, MASK_SIZES = layout.row, layout.col, layout.box, layout.all_values, layout.mask_sizes
+    best, best_size = None, layout.size + 1
+    rows, cols, boxes = masks.rows, masks.cols, masks.boxes
+    for cell in masks.empty:
+        size = MASK_SIZES[ALL_VALUES & ~(rows[ROW[cell]] | cols[COL[cell]] | boxes[BOX[cell]])]
+        if size < best_size:
+            best, best_size = cell, size
+            if size <= 1:
+                break
+    return best
+
+def mrv_degree(grid: Board, masks: Candidates) -> int:
+    """
+    Chooses the empty cell with the fewest candidates
+    Ties are broken by the degree of the cell, the number of empty cells in its row, column and box
+    The cell that constrains the most other cells is preferred
+
+    Parameters
+    ----------
+    grid: Board
+        the grid being worked on
+    masks: Candidates
+        the masks of the grid
+
+    Returns
+    -------
+    int
+        the chosen cell
+    """
+    layout = masks.layout
+    ROW, COL, BOX, ALL_VALUES, MASK_SIZES = layout.row, layout.col, layout.box, layout.all_values, layout.mask_sizes
+    best, best_key = None, (layout.size + 1, 0)
+    rows, cols, boxes = masks.rows, masks.cols, masks.boxes
+    for cell in masks.empty:
+        row, col, box = rows[ROW[cell]], cols[COL[cell]], boxes[BOX[cell]]
+        size = MASK_SIZES[ALL_VALUES & ~(row | col | box)]
+        if size > best_key[0]:
+            continue
+        if size == 0:
+            return cell
+        # the number of values missing from a unit is the number of empty cells in it
+        degree = 3 * layout.size - MASK_SIZES[row] - MASK_SIZES[col] - MASK_SIZES[box]
+        if (size, -degree) < best_key:
+            best, best_key = cell, (size, -degree)
+    return best
+
+# the strategies by name, this is used by the benchmark
+STRATEGIES = {"first_empty": first_empty, "mrv": mrv, "mrv_degree": mrv_degree}
@@ -1,22 +1,25 @@
 from solver import Solver
 import numpy as np
-from generator import Generator
+from board import Layout
+from pool import PuzzlePool
 class Sudoku:
     """
     This is the sudoku game itself
-    The game generated is almost always guaranteed to have a unique solution
+    The game generated is guaranteed to have a unique solution
 
     Attributes
     ----------
-    initial_state: np.ndarray((9,9), np.int8)
+    initial_state: np.ndarray((size,size), np.int8)
         stores the given problem
         Note: This value should never be changed for a given sudoku
-    current_state: np.ndarray((9,9), np.int8)
+    current_state: np.ndarray((size,size), np.int8)
         stores the current state of the sudoku as the user attempts to solve
-    solution: np.ndarray((9,9), np.int8)
+    solution: np.ndarray((size,size), np.int8)
         stores the solver used to generate the solution
     counter: int
         the counter used by the iterator
+    pool: PuzzlePool
+        the pool the problem was taken from, None for the boards bigger than 9 by 9
     
     Staticmethods
     -------------
@@ -24,16 +27,26 @@ class Sudoku:
         displays the sudoku grid
     """
 
-    def __init__(self):
-        problem = Generator().generate()
-        print("Generating...")
-        while not Solver.has_unique_solution(problem):
-            # randomly choose from the api or from the generator
-            problem = Generator().generate()
-            print("Generating...")
+    def __init__(self, pool: PuzzlePool = None, box: int = 3):
+        """
+        Parameters
+        ----------
+        pool: PuzzlePool, optional, default: None
+            the pool to take the problem from, if None the shared PuzzlePool.default() is used
+        box: int, optional, default: 3
+            the number of rows of a box, 4 gives a 16 by 16 game and 5 a 25 by 25 one
+        """
+        if box == 3:
+            self.pool = pool if pool is not None else PuzzlePool.default()
+            # the pool keeps unique problems with their solutions ready and refills itself in the background
+            problem, solution = self.pool.pop()
+        else:
+            # the pool only keeps 9 by 9 problems so the bigger ones are generated when they are asked for
+            self.pool = None
+            problem, solution = Solver(box=box).generate_unique()
         self.initial_state = problem
         self.current_state = np.array(problem) # adeep copy of the problem as this would change constantly
-        self.solution = Solver().solve(problem)
+        self.solution = solution
         self.counter = 0
 
     def __iter__(self):
@@ -56,31 +69,35 @@ class Sudoku:
         ----------
         board: Sudoku
             the sudoku board to be printed
+            values above 9 are displayed as letters, A for 10, B for 11 and so on
         """
+        # a Sudoku is its own iterator so its size is taken from its current state rather than a row
+        size = len(board.current_state if isinstance(board, Sudoku) else board)
+        box = Layout.of(size).box_size
         char = "\u2533\u2501\u2501\u2501"
         for i, row in enumerate(board):
             if i > 0:
-                if i %3 == 0 :
+                if i % box == 0 :
                     char = "\u254b\u2501\u2501\u2501"
                 else:
                     char = "\u254b\u2504\u2504\u2504"
-            print(" ", char * 9, char[0], sep="" )
+            print(" ", char * size, char[0], sep="" )
             for j, col in enumerate(row):
                 terminating = " \u2506 "
-                if j%3 == 0:
+                if j % box == 0:
                     print(' \u2503 ', end="")
-                if j == 8:
+                if j == size - 1:
                     terminating = " \u2503 "
-                elif (j + 1) % 3 == 0:
+                elif (j + 1) % box == 0:
                     terminating = ""
                 # if value is zero, print figure wide space
                 if col == 0:
                     print("\u2007", end=terminating)
                 else:
-                    print(col, end=terminating)
+                    print(col if col < 10 else chr(ord("A") + col - 10), end=terminating)
             print()
         char = "\u253b\u2501\u2501\u2501"
-        print(" ", char * 9, char[0], sep = "")
+        print(" ", char * size, char[0], sep = "")
 
 if __name__ == "__main__":
     grid = Sudoku()
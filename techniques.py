@@ -0,0 +1,225 @@
+from __future__ import annotations
+import itertools
+from board import LAYOUT, Layout
+
+# These functions are the deductions tried after the singles and before the search
+# they all take the candidates of every cell as masks (0 for a filled cell) and the layout of the board,
+# remove the candidates they can rule out in place and return the number removed
+
+def _eliminate(cells: list, targets: list, mask: int, layout: Layout) -> int:
+    # removes the values of mask from the target cells
+    removed = 0
+    for cell in targets:
+        if cells[cell] & mask:
+            removed += layout.mask_sizes[cells[cell] & mask]
+            cells[cell] &= ~mask
+    return removed
+
+def locked_candidates(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds the values of a box that can only go in one of its lines (pointing)
+    and the values of a line that can only go in one box (claiming)
+    The value is removed from the rest of the line or the box respectively
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    removed = 0
+    for common, box, line in layout.intersections:
+        shared = 0
+        for cell in common:
+            shared |= cells[cell]
+        if not shared:
+            continue
+        box_rest = line_rest = 0
+        for cell in box:
+            box_rest |= cells[cell]
+        for cell in line:
+            line_rest |= cells[cell]
+        removed += _eliminate(cells, line, shared & ~box_rest, layout)
+        removed += _eliminate(cells, box, shared & ~line_rest, layout)
+    return removed
+
+def _naked(cells: list, size: int, layout: Layout) -> int:
+    # size cells of a unit that hold only size values between them, the values go nowhere else in the unit
+    removed = 0
+    mask_sizes = layout.mask_sizes
+    for unit in layout.units:
+        small = [cell for cell in unit if 2 <= mask_sizes[cells[cell]] <= size]
+        for subset in itertools.combinations(small, size):
+            mask = 0
+            for cell in subset:
+                mask |= cells[cell]
+            if mask_sizes[mask] == size:
+                removed += _eliminate(cells, [cell for cell in unit if cell not in subset], mask, layout)
+    return removed
+
+def _hidden(cells: list, size: int, layout: Layout) -> int:
+    # size values of a unit that can only go in the same size cells, those cells hold nothing else
+    removed = 0
+    mask_sizes, mask_values = layout.mask_sizes, layout.mask_values
+    for unit in layout.units:
+        # where each value can go in the unit, bit i is the i-th cell of the unit
+        places = [0] * layout.size
+        for i, cell in enumerate(unit):
+            for val in mask_values[cells[cell]]:
+                places[val - 1] |= 1 << i
+        few = [bit for bit in range(layout.size) if 2 <= mask_sizes[places[bit]] <= size]
+        for subset in itertools.combinations(few, size):
+            where = 0
+            for bit in subset:
+                where |= places[bit]
+            if mask_sizes[where] == size:
+                keep = sum(1 << bit for bit in subset)
+                targets = [unit[i - 1] for i in mask_values[where]]
+                removed += _eliminate(cells, targets, layout.all_values & ~keep, layout)
+    return removed
+
+def _fish(cells: list, size: int, layout: Layout) -> int:
+    # a value that only goes in the same size columns of size rows is in none of the other rows of those columns
+    # and the same with the rows and columns swapped
+    removed = 0
+    mask_sizes, mask_values = layout.mask_sizes, layout.mask_values
+    rows, cols = layout.units[:layout.size], layout.units[layout.size:2 * layout.size]
+    for bases, covers in ((rows, cols), (cols, rows)):
+        for bit in range(layout.size):
+            mask = 1 << bit
+            # where the value can go in each base line, bit i is the i-th cover line
+            places = [sum(1 << i for i, cell in enumerate(base) if cells[cell] & mask) for base in bases]
+            few = [base for base in range(layout.size) if 2 <= mask_sizes[places[base]] <= size]
+            for subset in itertools.combinations(few, size):
+                where = 0
+                for base in subset:
+                    where |= places[base]
+                if mask_sizes[where] == size:
+                    targets = [covers[i - 1][base] for i in mask_values[where] for base in range(layout.size) if base not in subset]
+                    removed += _eliminate(cells, targets, mask, layout)
+    return removed
+
+def naked_pairs(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds two cells of a unit with the same two candidates, neither value can go anywhere else in the unit
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _naked(cells, 2, layout)
+
+def naked_triples(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds three cells of a unit with only three candidates between them,
+    none of the three values can go anywhere else in the unit
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _naked(cells, 3, layout)
+
+def hidden_pairs(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds two values that can only go in the same two cells of a unit, the other candidates of those cells are removed
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _hidden(cells, 2, layout)
+
+def hidden_triples(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds three values that can only go in the same three cells of a unit, the other candidates of those cells are removed
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _hidden(cells, 3, layout)
+
+def x_wing(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds a value that can only go in the same two columns of two rows,
+    it is removed from the rest of those columns (and the same for columns and rows)
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _fish(cells, 2, layout)
+
+def swordfish(cells: list, layout: Layout = LAYOUT) -> int:
+    """
+    Finds a value that can only go in the same three columns of three rows,
+    it is removed from the rest of those columns (and the same for columns and rows)
+
+    Parameters
+    ----------
+    cells: list[int]
+        the candidates of every cell
+    layout: Layout, optional, default: LAYOUT
+        the tables of the board
+
+    Returns
+    -------
+    int
+        the number of candidates removed
+    """
+    return _fish(cells, 3, layout)
+
+# the techniques by name in the order they are tried, the simplest first
+TECHNIQUES = {"locked_candidates": locked_candidates, "naked_pairs": naked_pairs, "hidden_pairs": hidden_pairs,
+    "naked_triples": naked_triples, "hidden_triples": hidden_triples, "x_wing": x_wing, "swordfish": swordfish}
+# how hard each technique is for a person, a puzzle is as hard as the hardest technique it needs
+# "singles" are the naked and hidden singles and "search" means the techniques were not enough
+DIFFICULTY = {"singles": 1, "locked_candidates": 2, "naked_pairs": 3, "hidden_pairs": 3, "naked_triples": 4,
+    "hidden_triples": 4, "x_wing": 5, "swordfish": 6, "search": 8}
@@ -1,7 +1,21 @@
-from solver import Solver
+from solver import Pending, Solver
 from sudoku import Sudoku
+from dlx import DLXSolver
+from batch import BatchSolver
+from pool import PuzzlePool
 from generator import Generator
+from canonical import SolutionCache
+from corpus import generate_puzzles
+from service import SolverClient, SolverService
+import techniques
+from board import LAYOUT
+from puzzle_io import from_string, read_puzzles, to_string
+import io
+import os
+import tempfile
+import asyncio
 from time import time
+import numpy as np
 
 # feel free to try out the given boards
 board1 =[[9,0,0,0,1,0,0,0,5],
@@ -55,8 +69,134 @@ print(f"Time: {end}")
 Solver.print_board(hs1)
 assert Solver.validate(hs1)
 assert Solver.has_unique_solution(hardest_sudoku_ever)
+assert hardest_sudoku_solver.count_solutions(hardest_sudoku_ever, limit=5) == 1
+assert hardest_sudoku_solver.count_solutions([[0] * 9 for _ in range(9)], limit=5) == 5
 
 
+# every technique on a hand-built grid of candidates, every cell can hold anything but the ones changed
+def candidates(*changed: tuple) -> list:
+    cells = [LAYOUT.all_values] * 81
+    for cell, mask in changed:
+        cells[cell] = mask
+    return cells
+def bits(*values: int) -> int:
+    return sum(1 << (val - 1) for val in values)
+no_1 = LAYOUT.all_values & ~bits(1)
+# a 1 in the top left box can only go in the top row so it goes nowhere else in that row
+cells = candidates(*[(9 * row + col, no_1) for row in (1, 2) for col in range(3)])
+assert techniques.locked_candidates(cells) == 6 and cells[3:9] == [no_1] * 6
+# 1 and 2 go in the first two cells of the top row and so of the top left box too
+cells = candidates((0, bits(1, 2)), (1, bits(1, 2)))
+assert techniques.naked_pairs(cells) == 26 and cells[2] == cells[9] == LAYOUT.all_values & ~bits(1, 2)
+cells = candidates(*[(cell, LAYOUT.all_values & ~bits(1, 2)) for cell in range(2, 9)])
+assert techniques.hidden_pairs(cells) == 14 and cells[:2] == [bits(1, 2)] * 2
+cells = candidates((0, bits(1, 2)), (1, bits(2, 3)), (2, bits(1, 3)))
+assert techniques.naked_triples(cells) == 36 and cells[3] == cells[9] == LAYOUT.all_values & ~bits(1, 2, 3)
+cells = candidates(*[(cell, LAYOUT.all_values & ~bits(1, 2, 3)) for cell in range(3, 9)])
+assert techniques.hidden_triples(cells) == 18 and cells[:3] == [bits(1, 2, 3)] * 3
+# a 1 only goes in columns 0 and 4 of rows 0 and 4, then in columns 0, 3 and 6 of rows 0, 3 and 6
+cells = candidates(*[(9 * row + col, no_1) for row in (0, 4) for col in range(9) if col not in (0, 4)])
+assert techniques.x_wing(cells) == 14 and [cells[9 * row] & 1 for row in range(9)] == [1, 0, 0, 0, 1, 0, 0, 0, 0]
+cells = candidates(*[(9 * row + col, no_1) for row in (0, 3, 6) for col in range(9) if col not in (0, 3, 6)])
+assert techniques.swordfish(cells) == 18 and [cells[9 * row + 3] & 1 for row in range(9)] == [1, 0, 0, 1, 0, 0, 1, 0, 0]
+# board1 only needs singles and Inkala's puzzle needs guessing
+assert Solver().rate(board1)[0] == 1 and Solver().rate(hardest_sudoku_ever)[0] == 8
+# the pool skips the saved puzzles that are not unique or whose solution is wrong
+with tempfile.TemporaryDirectory() as folder:
+    path = os.path.join(folder, "pool.txt")
+    swapped = to_string(hs1)[1] + to_string(hs1)[0] + to_string(hs1)[2:]
+    with open(path, "w") as saved:
+        saved.write(f"{to_string(hardest_sudoku_ever)} {swapped}\n{to_string(hs1)[:9] + '0' * 72} {to_string(hs1)}\n")
+        saved.write(f"{to_string(hardest_sudoku_ever)} {to_string(hs1)}\n")
+    pool = PuzzlePool(size=1, path=path)
+    assert [to_string(problem) for problem, _ in pool.puzzles] == [to_string(hardest_sudoku_ever)]
+    pool.close()
+
 game = Sudoku()
 Sudoku.print_board(game)
-Sudoku.print_board(game.solution)
\ No newline at end of file
+Sudoku.print_board(game.solution)
+# the bigger boards, 16 by 16 with its values above 9 printed as letters
+problem, solution = Solver(box=4).generate_unique()
+Sudoku.print_board(problem)
+assert Solver.validate(solution)
+assert Solver(box=4).count_solutions(problem) == 1
+assert (Solver(box=4).solve(problem) == solution).all()
+
+# the sums of a row of 5s are right but the values are not
+assert not Solver.validate(np.full((9, 9), 5, dtype=np.int8))
+assert Solver.validate(np.stack([hs1, hs1])).all()
+
+# a transposed and relabeled copy of a puzzle is answered from the cache
+cache = SolutionCache()
+cache.solve(hardest_sudoku_ever)
+relabeled = np.array([0, 9, 8, 7, 6, 5, 4, 3, 2, 1])[np.array(hardest_sudoku_ever).T]
+assert (cache.solve(relabeled) == np.array([0, 9, 8, 7, 6, 5, 4, 3, 2, 1])[hs1.T]).all() and cache.hits == 1
+
+# the shuffled grids are always full and valid and the seed makes them repeatable
+grids = Generator().full_grids(100, seed=1)
+assert Solver.validate(grids).all() and (grids == Generator().full_grids(100, seed=1)).all()
+
+# the reader skips comments and blank lines and takes . for an empty cell
+lines = io.StringIO("# Inkala\n\n" + to_string(hardest_sudoku_ever).replace("0", ".") + "\n  \n" + to_string(board1) + "\n")
+read = list(read_puzzles(lines))
+assert len(read) == 2 and (read[0] == hardest_sudoku_ever).all() and (read[1] == board1).all()
+
+# a search that runs out of nodes hands back a token that carries on where it stopped
+budgeted = Solver()
+result = budgeted.solve(hardest_sudoku_ever, max_nodes=5)
+while isinstance(result, Pending):
+    result = budgeted.resume(result, max_nodes=5)
+assert (result == hs1).all()
+# two 2s in the third row, the givens clash so there is nothing to search
+clashing = from_string("600000090000000000022000000300050000000300200020000500200900000850206004460000000")
+assert Solver().solve(clashing) is None and Solver().count_solutions(clashing) == 0
+# the dancing links solver gives the same answers
+dlx = DLXSolver()
+assert (dlx.solve(hardest_sudoku_ever) == hs1).all()
+assert dlx.count_solutions(np.zeros((9, 9), np.int8), limit=5) == 5 and dlx.solve(clashing) is None
+# a stack solved at once, in both shapes, the board with clashing givens comes back as zeros
+stack = np.array([board1, clashing, hardest_sudoku_ever], np.int8)
+for boards in (stack, stack.reshape((-1, 81))):
+    solutions, solved = BatchSolver().solve(boards)
+    assert solutions.shape == boards.shape and solved.tolist() == [True, False, True]
+    solutions = solutions.reshape((-1, 9, 9))
+    assert (solutions[0] == Solver().solve(board1)).all() and (solutions[1] == 0).all() and (solutions[2] == hs1).all()
+
+# a count can hand back the solutions it finds, the service uses this to solve and check in one search
+found = []
+assert budgeted.count_solutions(hardest_sudoku_ever, 2, solutions=found) == 1 and (found[0] == hs1).all()
+
+# replaying the trace on the board gives the solution and leaves the board as it was
+replayed = np.array(hardest_sudoku_ever)
+for event in Solver().trace(hardest_sudoku_ever):
+    if event.kind in ("place", "propagate"):
+        replayed[event.pos] = event.val
+    elif event.kind in ("remove", "backtrack"):
+        replayed[event.pos] = 0
+assert event.kind == "solved" and (replayed == hs1).all()
+
+# the service answers over a socket on localhost, the processes are only started when this file is run
+async def ask_service() -> list:
+    service = SolverService(workers=1)
+    server = await service.start()
+    async with await SolverClient.connect(port=server.sockets[0].getsockname()[1]) as client:
+        responses = await client.solve_many([hardest_sudoku_ever, board1])
+    server.close()
+    await service.close()
+    return responses
+
+if __name__ == "__main__":
+    responses = asyncio.run(ask_service())
+    assert responses[0]["unique"] and from_string(responses[0]["solution"]).tolist() == hs1.tolist()
+    assert Solver.validate(from_string(responses[1]["solution"]))
+
+    # solve_many gives the solutions in the order of the boards and None for a board without one
+    clash = np.zeros((9, 9), dtype=np.int8)
+    clash[0, :2] = 5
+    with hardest_sudoku_solver.pool(2) as pool:
+        solved = hardest_sudoku_solver.solve_many([board1, clash, hardest_sudoku_ever], chunksize=1, pool=pool)
+    assert solved[1] is None and (solved[2] == hs1).all()
+    assert (solved[0] == hardest_sudoku_solver.solve(board1)).all()
+
+    # the puzzles depend on the seed and not on the number of processes
+    assert list(generate_puzzles(6, seed=3, workers=1, chunksize=2)) == list(generate_puzzles(6, seed=3, workers=2, chunksize=2))